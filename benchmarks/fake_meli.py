@@ -0,0 +1,226 @@
+"""
+Offline stand-in for the MercadoLibre API endpoints used by the auditor and
+the item sync. Every response is derived from ids, so catalogs of any size
+cost no memory and repeated runs see the same data.
+
+    python -m benchmarks.fake_meli --orders 10000 --items 10000 --latency-ms 20 --error-rate 0.01
+
+Point the client at it with API_BASE_URL=http://127.0.0.1:8001.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+SELLER_ID = 900000001
+ORDER_ID_BASE = 2000000000
+SHIPMENT_ID_BASE = 40000000000
+ITEM_ID_BASE = 1000000000
+STATES = ["AR-C", "AR-B", "AR-S", "AR-X", "AR-M"]
+STATUSES = ["delivered", "delivered", "delivered", "shipped", "cancelled"]
+
+class FakeMeliConfig(NamedTuple):
+    orders: int = 1000
+    items: int = 1000
+    days: int = 30  # orders are spread evenly over the last `days`
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # share of requests answered with 429
+    retry_after: float = 0.1
+    pack_size: int = 1  # consecutive orders sharing one shipment (a pack/cart)
+    seed: int = 0
+
+def item_id(index: int) -> str:
+    return f"MLA{ITEM_ID_BASE + index}"
+
+def item_sku(index: int) -> str:
+    return f"SKU-{index:07d}"
+
+def item_dimensions(index: int) -> tuple:
+    """True (width, height, depth, weight_kg) of a synthetic item."""
+    rng = random.Random(index)
+    return rng.randint(5, 60), rng.randint(5, 40), rng.randint(2, 30), round(rng.uniform(0.1, 12.0), 3)
+
+def _item_index(value: str) -> Optional[int]:
+    try:
+        index = int(value.removeprefix("MLA")) - ITEM_ID_BASE
+    except ValueError:
+        return None
+    return index if index >= 0 else None
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def create_app(config: FakeMeliConfig = FakeMeliConfig()) -> FastAPI:
+    app = FastAPI(title="Fake MeLi API")
+    # Orders are created at fixed intervals ending when the server starts
+    end = datetime.now(timezone.utc)
+    step = timedelta(days=config.days) / max(config.orders, 1)
+    start = end - step * config.orders
+    rng = random.Random(config.seed)
+    pack_size = max(config.pack_size, 1)
+
+    def order_date(index: int) -> datetime:
+        return start + step * index
+
+    def order_index_at(moment: datetime) -> int:
+        # First order created at or after `moment`
+        position = (moment - start) / step
+        return min(max(int(position) + (position % 1 > 0), 0), config.orders)
+
+    def order(index: int) -> Dict[str, Any]:
+        item = index % max(config.items, 1)
+        return {
+            "id": ORDER_ID_BASE + index,
+            "date_created": order_date(index).isoformat(timespec="milliseconds"),
+            "status": "paid",
+            "shipping": {"id": SHIPMENT_ID_BASE + index // pack_size},
+            "order_items": [{
+                "item": {"id": item_id(item), "seller_sku": item_sku(item)},
+                "quantity": 1 + index % 3,
+            }],
+        }
+
+    def item(index: int) -> Dict[str, Any]:
+        width, height, depth, weight = item_dimensions(index)
+        return {
+            "id": item_id(index),
+            "title": f"Synthetic item {index}",
+            "price": 1000 + index % 5000,
+            "available_quantity": index % 50,
+            "status": "active",
+            "permalink": f"https://articulo.mercadolibre.com.ar/{item_id(index)}",
+            "thumbnail": None,
+            "seller_custom_field": item_sku(index),
+            "last_updated": (start + timedelta(minutes=index % 10000)).isoformat(timespec="milliseconds"),
+            "shipping": {"dimensions": f"{width}x{height}x{depth},{int(weight * 1000)}"},
+        }
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        if config.latency_ms or config.jitter_ms:
+            await asyncio.sleep((config.latency_ms + rng.uniform(0, config.jitter_ms)) / 1000)
+        if config.error_rate and rng.random() < config.error_rate:
+            return JSONResponse(
+                {"message": "Too many requests", "status": 429},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after)},
+            )
+        return await call_next(request)
+
+    @app.get("/users/me")
+    def get_me() -> Dict[str, Any]:
+        return {"id": SELLER_ID, "nickname": "FAKE_SELLER", "site_id": "MLA"}
+
+    @app.get("/orders/search")
+    def search_orders(request: Request, offset: int = 0, limit: int = 50, sort: str = "date_asc") -> Dict[str, Any]:
+        params = request.query_params
+        if "order.date_created.from" in params:
+            first = order_index_at(_parse_date(params["order.date_created.from"]))
+            # The "to" bound is inclusive
+            last = order_index_at(_parse_date(params["order.date_created.to"]) + timedelta(microseconds=1))
+        else:
+            first, last = 0, config.orders
+        total = max(last - first, 0)
+        indices = range(first, last)
+        if sort == "date_desc":
+            indices = indices[::-1]
+        page = indices[offset:offset + min(limit, 50)]
+        return {
+            "results": [order(i) for i in page],
+            "paging": {"total": total, "offset": offset, "limit": limit},
+        }
+
+    @app.get("/shipments/{shipment_id}")
+    def get_shipment(shipment_id: int) -> Dict[str, Any]:
+        first = (shipment_id - SHIPMENT_ID_BASE) * pack_size
+        if not 0 <= first < config.orders:
+            raise HTTPException(status_code=404, detail="Shipment not found")
+        shipment_rng = random.Random(shipment_id)
+        # Roughly one in four packages is measured larger than it really is
+        factor = 1.3 if shipment_rng.random() < 0.25 else 1.0
+        shipped, total_weight = [], 0.0
+        for index in range(first, min(first + pack_size, config.orders)):
+            item = index % max(config.items, 1)
+            width, height, depth, weight = item_dimensions(item)
+            total_weight += weight
+            shipped.append({
+                "id": item_id(item),
+                "dimensions": f"{width * factor:.1f}x{height:.1f}x{depth:.1f},{weight * 1000 * factor:.1f}",
+            })
+        return {
+            "id": shipment_id,
+            "status": shipment_rng.choice(STATUSES),
+            "base_cost": round(2500 + total_weight * 400 * factor, 2),
+            "receiver_address": {"state": {"id": shipment_rng.choice(STATES)}},
+            "shipping_items": shipped,
+        }
+
+    @app.get("/users/{user_id}/items/search")
+    def search_items(
+        user_id: int,
+        limit: int = 100,
+        offset: int = 0,
+        scroll_id: Optional[str] = None,
+        orders: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if orders == "last_updated_desc":
+            # Item i was last updated i % 10000 minutes after `start`
+            ranked = sorted(range(config.items), key=lambda i: (i % 10000, i), reverse=True)
+            return {
+                "results": [item_id(i) for i in ranked[offset:offset + min(limit, 100)]],
+                "paging": {"total": config.items, "offset": offset, "limit": limit},
+            }
+        # The scroll_id is simply the next position in the catalog
+        position = int(scroll_id) if scroll_id else 0
+        end_position = min(position + min(limit, 100), config.items)
+        return {
+            "results": [item_id(i) for i in range(position, end_position)],
+            "scroll_id": str(end_position) if end_position < config.items else None,
+            "paging": {"total": config.items, "limit": limit},
+        }
+
+    @app.get("/items")
+    def multiget_items(ids: str, attributes: Optional[str] = None) -> List[Dict[str, Any]]:
+        fields = attributes.split(",") if attributes else None
+        responses = []
+        for value in ids.split(",")[:20]:
+            index = _item_index(value)
+            if index is None or index >= config.items:
+                responses.append({"code": 404, "body": {"id": value, "message": "Item not found"}})
+                continue
+            body = item(index)
+            if fields:
+                body = {k: v for k, v in body.items() if k in fields}
+            responses.append({"code": 200, "body": body})
+        return responses
+
+    return app
+
+def write_sku_truth(path: str, items: int) -> None:
+    """Truth CSV matching the synthetic catalog, for auditing against the fake API."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("sku,weight_kg,width,height,depth\n")
+        for index in range(items):
+            width, height, depth, weight = item_dimensions(index)
+            f.write(f"{item_sku(index)},{weight},{width},{height},{depth}\n")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the fake MercadoLibre API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    defaults = FakeMeliConfig()
+    for field, default in defaults._asdict().items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=default)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeMeliConfig(**{field: getattr(args, field) for field in FakeMeliConfig._fields})
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
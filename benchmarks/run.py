@@ -0,0 +1,202 @@
+"""
+Load-test the audit and item-sync hot paths against the fake MeLi API.
+
+    python -m benchmarks.run audit --scale 1000 10000 100000
+    python -m benchmarks.run sync --scale 1000 10000 --latency-ms 20 --error-rate 0.01
+
+For every scale a fake API is started with that many orders/items and the
+target runs in a fresh process, which reports throughput, p50/p99 HTTP
+latency as seen by the client, 429s received and peak RSS.
+
+`sync` writes to the database at DATABASE_URL (use a scratch one: it creates
+a benchmark seller and replaces its items on every run).
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import requests
+
+# Client settings are read at import time, so they are set before importing src.*
+BENCH_ENV = {
+    "APP_ID": os.environ.get("APP_ID", "bench"),
+    "CLIENT_SECRET": os.environ.get("CLIENT_SECRET", "bench"),
+    # Client-side throttling would only measure the bucket refill rate
+    "RATE_LIMIT_APP_PER_SECOND": "0",
+    "RATE_LIMIT_SELLER_PER_SECOND": "0",
+    "CACHE_ENABLED": "false",
+    "TOKEN_REFRESHER_ENABLED": "false",
+}
+
+class StaticAuth:
+    """Fixed token; the fake API doesn't check it."""
+    def get_token(self) -> str:
+        return "APP_USR-benchmark"
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _start_fake_api(args: argparse.Namespace, scale: int) -> tuple:
+    port = _free_port()
+    process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_meli", "--port", str(port),
+        "--orders", str(scale), "--items", str(scale), "--days", str(args.days),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--pack-size", str(args.pack_size),
+    ])
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{base_url}/users/me", timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Fake MeLi API did not start")
+
+def _percentile(values: List[float], share: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(share * len(values)), len(values) - 1)]
+
+def _instrument(client: Any, latencies: List[float], statuses: Dict[int, int]) -> None:
+    def record(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+        latencies.append(response.elapsed.total_seconds())
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    client.session.hooks["response"].append(record)
+
+def _run_audit(scale: int, args: Dict[str, Any]) -> Dict[str, Any]:
+    from src.meli_auditor.auditor import MeliAuditor
+    from src.meli_auditor.client import MeliClient
+    from benchmarks.fake_meli import write_sku_truth
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    client = MeliClient(StaticAuth(), pool_maxsize=args["workers"])
+    _instrument(client, latencies, statuses)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        truth_path = os.path.join(tmp, "sku_truth.csv")
+        write_sku_truth(truth_path, scale)
+        started = time.perf_counter()
+        auditor = MeliAuditor(client, truth_path, max_workers=args["workers"])
+        date_to = datetime.now(timezone.utc)
+        df = auditor.audit_orders(date_from=date_to - timedelta(days=args["days"] + 1), date_to=date_to)
+        elapsed = time.perf_counter() - started
+    # Throughput is per order; multi-line orders give several rows each
+    orders = df["order_id"].nunique() if not df.empty else 0
+    return {"units": orders, "elapsed": elapsed, "latencies": latencies, "statuses": statuses}
+
+def _run_sync(scale: int, args: Dict[str, Any]) -> Dict[str, Any]:
+    from sqlmodel import SQLModel, delete, select
+    from src.app.core.db import engine, session_scope
+    from src.app.models.credential import MeliCredential
+    from src.app.models.item import Item
+    from src.app.models.user import User
+    from src.app.services import sync
+    from benchmarks.fake_meli import SELLER_ID
+
+    SQLModel.metadata.create_all(engine)
+    with session_scope() as session:
+        user = session.exec(select(User).where(User.meli_user_id == SELLER_ID)).first()
+        if user is None:
+            user = User(email="benchmark@example.com", meli_user_id=SELLER_ID)
+            session.add(user)
+            session.commit()
+            session.refresh(user)
+        credential = session.exec(select(MeliCredential).where(MeliCredential.user_id == user.id)).first()
+        if credential is None:
+            session.add(MeliCredential(
+                user_id=user.id, access_token="APP_USR-benchmark", refresh_token="TG-benchmark",
+                expires_at=int(time.time()) + 365 * 24 * 3600,
+            ))
+        session.exec(delete(Item).where(Item.user_id == user.id))
+        session.commit()
+        user_id = user.id
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    setup_client = sync.setup_client
+
+    def instrumented_setup(session: Any, user_id: int) -> Any:
+        setup = setup_client(session, user_id)
+        if setup is not None:
+            _instrument(setup[2], latencies, statuses)
+        return setup
+
+    sync.setup_client = instrumented_setup
+    with session_scope() as session:
+        started = time.perf_counter()
+        sync.sync_user_items(user_id, session, mode="full")
+        elapsed = time.perf_counter() - started
+        units = len(session.exec(select(Item.id).where(Item.user_id == user_id)).all())
+    return {"units": units, "elapsed": elapsed, "latencies": latencies, "statuses": statuses}
+
+TARGETS = {"audit": (_run_audit, "orders"), "sync": (_run_sync, "items")}
+
+def _child(target: str, scale: int, base_url: str, args: Dict[str, Any], results: Any) -> None:
+    os.environ.update(BENCH_ENV, API_BASE_URL=base_url)
+    try:
+        result = TARGETS[target][0](scale, args)
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result["peak_rss_mb"] = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        results.put(result)
+    except Exception as e:
+        results.put({"error": repr(e)})
+
+def run_scale(target: str, scale: int, args: argparse.Namespace) -> Dict[str, Any]:
+    process, base_url = _start_fake_api(args, scale)
+    try:
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        child = context.Process(target=_child, args=(target, scale, base_url, vars(args), results))
+        child.start()
+        result = results.get()
+        child.join()
+    finally:
+        process.terminate()
+        process.wait()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark audit_orders / sync_user_items against the fake MeLi API")
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("--scale", type=int, nargs="+", default=[1000, 10000, 100000], help="Orders (audit) or items (sync)")
+    parser.add_argument("--workers", type=int, default=8, help="Audit shipment workers")
+    parser.add_argument("--days", type=int, default=30, help="Span the fake orders are spread over")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--pack-size", type=int, default=1, help="Consecutive fake orders sharing one shipment")
+    args = parser.parse_args()
+
+    unit = TARGETS[args.target][1]
+    print(f"{'scale':>8} {unit + '/s':>10} {'seconds':>8} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'429s':>6} {'peak MB':>8}")
+    for scale in args.scale:
+        result = run_scale(args.target, scale, args)
+        if "error" in result:
+            print(f"{scale:>8} failed: {result['error']}")
+            continue
+        latencies = result["latencies"]
+        print(
+            f"{scale:>8} {result['units'] / result['elapsed']:>10.1f} {result['elapsed']:>8.2f} {len(latencies):>9} "
+            f"{_percentile(latencies, 0.50) * 1000:>8.1f} {_percentile(latencies, 0.99) * 1000:>8.1f} "
+            f"{result['statuses'].get(429, 0):>6} {result['peak_rss_mb']:>8.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
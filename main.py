@@ -1,11 +1,34 @@
+import argparse
 import sys
-import pandas as pd
+from datetime import datetime, timedelta, timezone
+from src.meli_auditor import metrics, tracing
 from src.meli_auditor.config import settings
 from src.meli_auditor.auth import MeliAuth
+from src.meli_auditor.cache import ResponseCache
 from src.meli_auditor.client import MeliClient
 from src.meli_auditor.auditor import MeliAuditor
+from src.meli_auditor.rate_card import RateCard
+from src.meli_auditor.report import open_report_writer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="MeLi Shipping Auditor")
+    parser.add_argument("--days", type=int, default=None,
+                        help="Audit every order from the last N days instead of the latest 50")
+    parser.add_argument("--output", default="report.xlsx",
+                        help="Report file: .xlsx, .csv, .csv.gz or .parquet (needs pyarrow)")
+    parser.add_argument("--cache", action="store_true", default=settings.CACHE_ENABLED,
+                        help="Cache shipment/item responses (in memory and in CACHE_PATH)")
+    parser.add_argument("--trace", default=settings.TRACE_PATH,
+                        help="Write a Chrome/Perfetto trace of the run to this JSON file")
+    parser.add_argument("--profile", default=None,
+                        help="Write cProfile stats of the run to this file (view with snakeviz or pstats)")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    # Nothing scrapes a one-off CLI run
+    metrics.disable()
+    trace_path = tracing.configure(args.trace)
     print("Initializing MeLi Shipping Auditor...")
     
     # 1. Authentication
@@ -21,32 +44,47 @@ def main():
         print("Authentication successful!")
 
     # 2. Setup Client
-    client = MeliClient(auth)
+    cache = ResponseCache(settings.CACHE_PATH) if args.cache else None
+    client = MeliClient(auth, cache=cache)
+
+    with tracing.profiled(args.profile):
+        run_audit(args, client)
+    if trace_path:
+        tracing.write(trace_path)
+        print(f"Trace written to {trace_path}")
 
-    # 3. Load CSV Proof
+def run_audit(args, client: MeliClient):
+    # 3. Load CSV Proof (and the optional rate card)
+    rate_card = RateCard.load(settings.RATE_CARD_PATH) if settings.RATE_CARD_PATH else None
     csv_path = "sku_truth.csv"
     try:
         # Check if file exists roughly by trying to instantiate auditor which reads it
-        auditor = MeliAuditor(client, csv_path)
+        auditor = MeliAuditor(client, csv_path, rate_card=rate_card)
     except FileNotFoundError:
         print(f"Error: {csv_path} not found. Please create it first.")
         sys.exit(1)
 
-    # 4. Run Audit
-    print("Starting audit for last 50 orders...")
-    df = auditor.audit_orders(limit=50)
+    # 4. Run Audit (batch by batch)
+    if args.days:
+        date_to = datetime.now(timezone.utc)
+        date_from = date_to - timedelta(days=args.days)
+        print(f"Starting audit for orders of the last {args.days} days...")
+        frames = auditor.iter_audit_frames(date_from=date_from, date_to=date_to)
+    else:
+        print("Starting audit for last 50 orders...")
+        frames = auditor.iter_audit_frames(limit=50)
 
-    if df.empty:
+    # 5. Calculate/Estimate Loss and 6. Save Report, streaming each batch to disk
+    output_file = args.output
+    with open_report_writer(output_file) as writer:
+        for df in frames:
+            writer.write(auditor.calculate_money_lost(df))
+
+    if writer.rows_written == 0:
         print("No audit results found (no orders or no matching SKUs).")
         return
 
-    # 5. Calculate/Estimate Loss
-    df = auditor.calculate_money_lost(df)
-
-    # 6. Save Report
-    output_file = "report.xlsx"
-    df.to_excel(output_file, index=False)
-    print(f"Audit complete. Report saved to {output_file}")
+    print(f"Audit complete. {writer.rows_written} rows saved to {output_file}")
 
 if __name__ == "__main__":
     main()
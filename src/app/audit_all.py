@@ -0,0 +1,38 @@
+import argparse
+import logging
+from sqlmodel import SQLModel
+from src.app.core.config import settings
+from src.app.core.db import engine, session_scope
+import src.app.models # Import models to register them
+from src.app.services.audit_runs import create_audit_run, get_unfinished_run, run_audit_run
+
+logger = logging.getLogger(__name__)
+
+def start():
+    parser = argparse.ArgumentParser(description="Audit every active seller, several in parallel")
+    parser.add_argument("--days", type=int, default=30, help="Audit orders from the last N days (new runs only)")
+    parser.add_argument("--processes", type=int, default=settings.AUDIT_RUN_PROCESSES,
+                        help="Sellers audited in parallel")
+    parser.add_argument("--run-id", type=int, help="Resume this run instead of the latest interrupted one")
+    parser.add_argument("--new", action="store_true", help="Start a new run even if one was interrupted")
+    parser.add_argument("--retry-failed", action="store_true", help="Also re-audit sellers that failed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    SQLModel.metadata.create_all(engine)
+    with session_scope() as session:
+        if args.run_id is not None:
+            run_id = args.run_id
+        else:
+            run = None if args.new else get_unfinished_run(session)
+            if run is not None:
+                logger.info(f"Resuming interrupted audit run {run.id}")
+            else:
+                run = create_audit_run(session, args.days)
+            run_id = run.id
+
+    run = run_audit_run(run_id, args.processes, retry_failed=args.retry_failed)
+    logger.info(f"Audit run {run.id} finished: {run.status}")
+
+if __name__ == "__main__":
+    start()
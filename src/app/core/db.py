@@ -1,8 +1,27 @@
+from contextlib import contextmanager
+from typing import Iterator
 from sqlmodel import create_engine, Session
 from src.app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
 
 def get_session():
+    """Request-scoped session (FastAPI dependency). Closed once the response is sent."""
+    with Session(engine) as session:
+        yield session
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Session for work outside a request: background tasks, job workers, scripts.
+    Never hand a get_session() session to background work, it is closed with the request.
+    """
     with Session(engine) as session:
         yield session
@@ -1,27 +1,45 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import RedirectResponse, Response
 from sqlmodel import SQLModel
-from src.app.routers import auth, sync
+from src.app.routers import audit, auth, notifications, sync, truth
+from src.app.core.config import settings
 from src.app.core.db import engine
-from src.app.models.user import User
-from src.app.models.credential import MeliCredential
-from src.app.models.item import Item # Import models to register them
+import src.app.models # Import models to register them
+from src.app.services.tokens import TokenRefresher
+from src.meli_auditor import metrics
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     SQLModel.metadata.create_all(engine)
+    refresher = TokenRefresher() if settings.TOKEN_REFRESHER_ENABLED else None
+    if refresher:
+        refresher.start()
     yield
+    if refresher:
+        refresher.stop()
+    engine.dispose()
 
 app = FastAPI(title="MeLi Auditor API", lifespan=lifespan)
 
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(sync.router, prefix="/sync", tags=["Sync"])
+app.include_router(audit.router, prefix="/audit", tags=["Audit"])
+app.include_router(truth.router, prefix="/truth", tags=["Truth"])
+app.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics: API latency/status/retries, rate limit waits, pipeline stage timings."""
+    if not metrics.enabled():
+        raise HTTPException(status_code=404, detail="Metrics disabled (set METRICS_ENABLED and install prometheus_client)")
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/docs")
@@ -0,0 +1,17 @@
+# Importing the package registers every table with SQLModel.metadata
+from src.app.models.user import User
+from src.app.models.credential import MeliCredential
+from src.app.models.item import Item
+from src.app.models.job import Job
+from src.app.models.shipment import Shipment
+from src.app.models.order_line import OrderLine
+from src.app.models.audit_result import AuditResult
+from src.app.models.sku_truth import SkuTruth
+from src.app.models.audit_run import AuditRun, AuditRunSeller
+from src.app.models.checkpoint import Checkpoint
+from src.app.models.item_change import ItemChange
+
+__all__ = [
+    "User", "MeliCredential", "Item", "Job", "Shipment", "OrderLine", "AuditResult", "SkuTruth",
+    "AuditRun", "AuditRunSeller", "Checkpoint", "ItemChange",
+]
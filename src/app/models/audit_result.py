@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from sqlalchemy import BigInteger, DateTime, Index, UniqueConstraint
+from src.app.models.job import utcnow
+
+class AuditResult(SQLModel, table=True):
+    """One audited order line: billed vs truth for its SKU."""
+    __tablename__ = "audit_result"
+    __table_args__ = (
+        UniqueConstraint("order_id", "item_id", name="uq_audit_result_order_item"),
+        # Keyset pagination walks (user_id, id) backwards
+        Index("ix_audit_result_user_id_id", "user_id", "id"),
+        Index("ix_audit_result_user_date", "user_id", "date_created"),
+        Index("ix_audit_result_user_sku", "user_id", "sku"),
+        Index("ix_audit_result_user_status", "user_id", "status"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    order_id: int = Field(sa_type=BigInteger)
+    item_id: str
+    shipment_id: int = Field(sa_type=BigInteger)
+    sku: str
+    quantity: int
+    date_created: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    status: Optional[str] = None
+    billed_cost: Optional[float] = None
+    truth_weight: Optional[float] = None
+    truth_billable_weight: Optional[float] = None
+    billed_billable_weight: Optional[float] = None
+    billable_weight_delta: Optional[float] = None
+    expected_cost: Optional[float] = None
+    money_lost_estimate: Optional[float] = None
+    audited_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from sqlalchemy import DateTime, UniqueConstraint
+from src.app.models.job import utcnow
+
+RUN_PENDING = "pending"
+RUN_RUNNING = "running"
+RUN_DONE = "done"
+RUN_FAILED = "failed"
+
+class AuditRun(SQLModel, table=True):
+    """
+    One multi-seller audit over a fixed date window. The window is stored so
+    a resumed run audits exactly the same orders.
+    """
+    __tablename__ = "audit_run"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: str = Field(default=RUN_RUNNING, index=True)
+    date_from: datetime = Field(sa_type=DateTime(timezone=True))
+    date_to: datetime = Field(sa_type=DateTime(timezone=True))
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+    finished_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+
+class AuditRunSeller(SQLModel, table=True):
+    """Checkpoint of one seller within an AuditRun."""
+    __tablename__ = "audit_run_seller"
+    __table_args__ = (
+        UniqueConstraint("run_id", "user_id", name="uq_audit_run_seller_run_user"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: int = Field(foreign_key="audit_run.id", index=True)
+    user_id: int = Field(foreign_key="user.id")
+    status: str = Field(default=RUN_PENDING)
+    lines: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    finished_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
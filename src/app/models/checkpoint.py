@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, DateTime, JSON, UniqueConstraint
+from src.app.models.job import utcnow
+
+class Checkpoint(SQLModel, table=True):
+    """
+    Progress of a seller's long-running task (e.g. 'audit', 'sync_items'),
+    saved as it goes so a failed run can resume. Removed once the task completes,
+    except 'sync_items_watermark', the baseline of the next incremental sync.
+    """
+    __table_args__ = (
+        UniqueConstraint("user_id", "kind", name="uq_checkpoint_user_kind"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    kind: str
+    state: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
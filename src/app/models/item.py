@@ -11,3 +11,5 @@ class Item(SQLModel, table=True):
     status: str
     official_store_id: Optional[int] = None
     dimensions: Optional[str] = None
+    last_updated: Optional[str] = Field(default=None, description="MeLi 'last_updated' timestamp, as returned by the API")
+    content_hash: Optional[str] = Field(default=None, description="SHA-1 of the synced fields, used to skip unchanged rows")
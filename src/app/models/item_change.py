@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from sqlalchemy import DateTime, UniqueConstraint
+from src.app.models.job import utcnow
+
+class ItemChange(SQLModel, table=True):
+    """
+    An item MeLi notified us about that has not been re-synced yet.
+    One row per (seller, item): repeated notifications only bump received_at.
+    """
+    __tablename__ = "item_change"
+    __table_args__ = (
+        UniqueConstraint("user_id", "item_id", name="uq_item_change_user_item"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    item_id: str
+    received_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, DateTime, Index, JSON, text
+from sqlmodel import Field, SQLModel
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+class Job(SQLModel, table=True):
+    """
+    Durable background job (e.g. an item sync), claimed by workers with
+    SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    __table_args__ = (
+        # At most one queued/running job per seller and kind (dedup)
+        Index(
+            "ix_job_active_user_kind", "user_id", "kind", unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    kind: str = Field(description="Handler name, e.g. 'sync_items'")
+    params: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    status: str = Field(default=JOB_QUEUED, index=True)
+    attempts: int = 0
+    error: Optional[str] = None
+    worker_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+    started_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    heartbeat_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    finished_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from sqlalchemy import BigInteger, DateTime, Index, UniqueConstraint
+
+class OrderLine(SQLModel, table=True):
+    __tablename__ = "order_line"
+    __table_args__ = (
+        UniqueConstraint("order_id", "item_id", name="uq_order_line_order_item"),
+        Index("ix_order_line_user_date", "user_id", "date_created"),
+        Index("ix_order_line_user_sku", "user_id", "sku"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    order_id: int = Field(index=True, sa_type=BigInteger, description="MeLi Order ID")
+    item_id: str = Field(description="MeLi Item ID")
+    shipment_id: int = Field(index=True, sa_type=BigInteger)
+    sku: str
+    quantity: int
+    date_created: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from sqlalchemy import BigInteger, DateTime, Index
+from src.app.models.job import utcnow
+
+class Shipment(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_shipment_user_status", "user_id", "status"),
+    )
+
+    id: int = Field(primary_key=True, sa_type=BigInteger, sa_column_kwargs={"autoincrement": False}, description="MeLi Shipment ID")
+    user_id: int = Field(foreign_key="user.id", index=True)
+    status: Optional[str] = None
+    billed_cost: Optional[float] = None
+    destination: Optional[str] = Field(default=None, description="Receiver state id")
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
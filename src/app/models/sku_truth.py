@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from sqlalchemy import DateTime, UniqueConstraint
+from src.app.models.job import utcnow
+
+class SkuTruth(SQLModel, table=True):
+    """Real weight (kg) and dimensions (cm) of one of a seller's SKUs."""
+    __tablename__ = "sku_truth"
+    __table_args__ = (
+        # Also serves the per-batch lookups by (user_id, sku)
+        UniqueConstraint("user_id", "sku", name="uq_sku_truth_user_sku"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    sku: str
+    weight_kg: float
+    width: float
+    height: float
+    depth: float
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
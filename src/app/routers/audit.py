@@ -0,0 +1,104 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from src.app.core.db import get_session, session_scope
+from src.app.models.audit_result import AuditResult
+from src.app.models.user import User
+from src.app.services.audit import audit_results_query, iter_audit_results
+from src.app.services.jobs import enqueue_job
+
+router = APIRouter()
+
+@router.post("/run")
+def trigger_audit(user_id: int, days: int = 30, session: Session = Depends(get_session)):
+    """
+    Queues an audit of the user's orders from the last `days` days.
+    Results are stored and served by GET /audit/results.
+    """
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    job, created = enqueue_job(session, user_id, "audit", {"days": days})
+    return {
+        "status": "accepted" if created else "already_queued",
+        "user_id": user_id,
+        "job_id": job.id,
+    }
+
+@router.get("/results")
+def get_audit_results(
+    user_id: int,
+    sku: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_money_lost: Optional[float] = None,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+    session: Session = Depends(get_session)
+) -> Dict[str, Any]:
+    """
+    Stored audit results, newest first, with keyset pagination: pass the
+    returned `next_after_id` as `after_id` to get the next page.
+    """
+    limit = max(1, min(limit, 1000))
+    statement = audit_results_query(user_id, sku, status, date_from, date_to, min_money_lost)
+    if after_id is not None:
+        statement = statement.where(AuditResult.id < after_id)
+
+    results = session.exec(statement.order_by(AuditResult.id.desc()).limit(limit)).all()
+    next_after_id = results[-1].id if len(results) == limit else None
+    return {"results": results, "next_after_id": next_after_id}
+
+REPORT_COLUMNS = list(AuditResult.model_fields)
+
+def _csv_chunks(statement) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REPORT_COLUMNS)
+    # The request session is closed before the body streams, so use our own
+    with session_scope() as session:
+        for chunk in iter_audit_results(session, statement):
+            for result in chunk:
+                writer.writerow([getattr(result, column) for column in REPORT_COLUMNS])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def _gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@router.get("/report")
+def download_audit_report(
+    user_id: int,
+    sku: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_money_lost: Optional[float] = None,
+    compress: bool = False,
+):
+    """
+    Streams stored audit results as CSV (gzip-compressed with `compress=true`),
+    reading the table page by page so memory stays flat for any report size.
+    """
+    statement = audit_results_query(user_id, sku, status, date_from, date_to, min_money_lost)
+    filename = f"audit_{user_id}.csv" + (".gz" if compress else "")
+    body = _gzip_chunks(_csv_chunks(statement)) if compress else _csv_chunks(statement)
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if compress else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -7,6 +7,7 @@ from src.meli_auditor.auth import MeliAuth
 from src.app.core.db import get_session
 from src.app.models.user import User
 from src.app.models.credential import MeliCredential
+from src.app.services.tokens import invalidate_cached_token
 
 router = APIRouter()
 auth_handler = MeliAuth()
@@ -63,6 +64,7 @@ def callback(code: str, session: Session = Depends(get_session)):
             session.add(credential)
         
         session.commit()
+        invalidate_cached_token(credential.id)
 
         return {"status": "success", "user_id": user.id, "meli_user_id": user.meli_user_id}
     except Exception as e:
@@ -0,0 +1,49 @@
+import logging
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from src.app.core.db import get_session
+from src.app.models.user import User
+from src.app.services.jobs import enqueue_job
+from src.app.services.sync import record_item_change
+from src.meli_auditor.config import settings as auditor_settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+class MeliNotification(BaseModel):
+    resource: str
+    user_id: int
+    topic: str
+    application_id: Optional[int] = None
+    attempts: Optional[int] = None
+    sent: Optional[str] = None
+    received: Optional[str] = None
+
+@router.post("")
+def receive_notification(notification: MeliNotification, session: Session = Depends(get_session)) -> Dict[str, Any]:
+    """
+    Mercado Libre notifications callback (configure it as the app's notifications URL).
+    'items' notifications add the item to the seller's change feed and queue a
+    'sync_item_changes' job (one per seller at a time), so they survive restarts.
+    MeLi expects a fast 200; other topics are acknowledged and ignored.
+    """
+    if str(notification.application_id) != auditor_settings.APP_ID:
+        logger.warning(f"Rejecting notification for application_id={notification.application_id}")
+        raise HTTPException(status_code=403, detail="Notification is for another application")
+
+    if notification.topic == "items" and notification.resource.startswith("/items/"):
+        user = session.exec(select(User).where(User.meli_user_id == notification.user_id)).first()
+        if not user:
+            logger.warning(f"Notification for unknown MeLi user {notification.user_id}, ignoring.")
+            return {"status": "ignored"}
+
+        item_id = notification.resource.rsplit("/", 1)[-1]
+        record_item_change(session, user.id, item_id)
+        job, _ = enqueue_job(session, user.id, "sync_item_changes")
+        return {"status": "accepted", "item_id": item_id, "job_id": job.id}
+
+    logger.info(f"Ignoring notification topic={notification.topic} resource={notification.resource}")
+    return {"status": "ignored"}
@@ -1,24 +1,52 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 from src.app.core.db import get_session
-from src.app.services.sync import sync_user_items
+from src.app.models.job import Job
 from src.app.models.user import User
+from src.app.services.jobs import enqueue_job, list_jobs
 
 router = APIRouter()
 
 @router.post("/items")
 def trigger_sync_items(
     user_id: int, 
-    background_tasks: BackgroundTasks, 
+    mode: Literal["incremental", "reconcile", "full"] = "incremental",
     session: Session = Depends(get_session)
 ):
     """
-    Triggers the synchronization of items for a specific user.
+    Queues the synchronization of items for a specific user.
+    `incremental` only fetches items updated since the last sync (plus notified
+    ones), `reconcile` checks every item for changes, `full` re-pulls everything.
+    The job runs in a separate worker process (`poetry run worker`); if the
+    user already has a sync queued or running, that job is returned instead.
     """
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    background_tasks.add_task(sync_user_items, user_id, session)
+    job, created = enqueue_job(session, user_id, "sync_items", {"mode": mode})
     
-    return {"status": "accepted", "message": "Sync started in background", "user_id": user_id}
+    return {
+        "status": "accepted" if created else "already_queued",
+        "message": "Sync queued" if created else f"Sync already {job.status}",
+        "user_id": user_id,
+        "job_id": job.id,
+    }
+
+@router.get("/jobs", response_model=List[Job])
+def get_jobs(
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+    session: Session = Depends(get_session)
+):
+    """Lists recent jobs, newest first."""
+    return list_jobs(session, user_id=user_id, status=status, limit=min(limit, 500))
+
+@router.get("/jobs/{job_id}", response_model=Job)
+def get_job(job_id: int, session: Session = Depends(get_session)):
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
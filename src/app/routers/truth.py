@@ -0,0 +1,48 @@
+import io
+import tempfile
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from src.app.core.db import get_session
+from src.app.models.user import User
+from src.app.services.truth import copy_sku_truth
+
+router = APIRouter()
+
+# Uploads larger than this are spooled to a temp file instead of memory
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+def _copy_upload(session: Session, user_id: int, spool: Any, replace: bool) -> Dict[str, int]:
+    if not session.get(User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    try:
+        # utf-8-sig drops the BOM spreadsheet exports like to add
+        return copy_sku_truth(session, user_id, io.TextIOWrapper(spool, encoding="utf-8-sig"), replace)
+    except (ValueError, UnicodeDecodeError) as e:
+        session.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid truth CSV: {e}")
+
+@router.post("/upload")
+async def upload_sku_truth(
+    user_id: int,
+    request: Request,
+    replace: bool = False,
+    session: Session = Depends(get_session)
+) -> Dict[str, Any]:
+    """
+    Loads the user's SKU truth table from a CSV request body
+    (Content-Type: text/csv, columns sku,weight_kg,width,height,depth).
+    Existing SKUs are updated; with `replace=true` SKUs missing from the
+    upload are deleted. Invalid rows are skipped.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        # COPY is blocking, keep it off the event loop
+        counts = await run_in_threadpool(_copy_upload, session, user_id, spool, replace)
+    finally:
+        spool.close()
+    return {"status": "ok", "user_id": user_id, **counts}
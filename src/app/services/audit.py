@@ -0,0 +1,191 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+from sqlmodel import Session, select
+from sqlmodel.sql.expression import SelectOfScalar
+from src.app.core.config import settings
+from src.app.models.audit_result import AuditResult
+from src.app.models.job import utcnow
+from src.app.models.order_line import OrderLine
+from src.app.models.shipment import Shipment
+from src.app.services.checkpoints import clear_checkpoint, load_checkpoint, save_checkpoint
+from src.app.services.sync import setup_client
+from src.app.services.truth import load_sku_truth_for
+from src.app.services.upserts import bulk_upsert
+from src.meli_auditor import metrics
+from src.meli_auditor.auditor import MeliAuditor
+from src.meli_auditor.config import settings as auditor_settings
+from src.meli_auditor.rate_card import RateCard
+
+logger = logging.getLogger(__name__)
+
+AUDIT_CHECKPOINT_KIND = "audit"
+
+SHIPMENT_COLUMNS = ["shipment_id", "status", "billed_cost", "destination"]
+ORDER_LINE_COLUMNS = ["order_id", "item_id", "shipment_id", "sku", "quantity", "date_created"]
+AUDIT_RESULT_COLUMNS = [
+    "order_id", "item_id", "shipment_id", "sku", "quantity", "date_created", "status", "billed_cost",
+    "truth_weight", "truth_billable_weight", "billed_billable_weight", "billable_weight_delta",
+    "expected_cost", "money_lost_estimate",
+]
+
+def _records(frame: pd.DataFrame, columns: List[str], user_id: int) -> List[Dict[str, Any]]:
+    # Plain Python values (None for NaN/NaT) so the DB driver can adapt them
+    subset = frame.reindex(columns=columns)
+    subset = subset.astype(object).where(subset.notna(), None)
+    rows = []
+    for record in subset.to_dict("records"):
+        record = {k: (v.to_pydatetime() if isinstance(v, pd.Timestamp) else v) for k, v in record.items()}
+        record["user_id"] = user_id
+        rows.append(record)
+    return rows
+
+def persist_audit_frame(session: Session, user_id: int, frame: pd.DataFrame) -> int:
+    """
+    Store one audit batch: its shipments, order lines and results, then commit.
+    Re-auditing the same orders updates the existing rows.
+    """
+    if frame.empty:
+        return 0
+    frame = frame.assign(
+        date_created=pd.to_datetime(frame["date_created"], utc=True, errors="coerce"),
+        # Placeholder text when no rate card is configured
+        money_lost_estimate=pd.to_numeric(frame.get("money_lost_estimate"), errors="coerce"),
+    )
+
+    with metrics.stage("audit", "db_write"):
+        shipments = _records(frame, SHIPMENT_COLUMNS, user_id)
+        for row in shipments:
+            row["id"] = row.pop("shipment_id")
+            row["updated_at"] = utcnow()
+        batch_size = settings.AUDIT_WRITE_BATCH_SIZE
+        bulk_upsert(session, Shipment, shipments, ["id"], batch_size)
+        bulk_upsert(session, OrderLine, _records(frame, ORDER_LINE_COLUMNS, user_id), ["order_id", "item_id"], batch_size)
+        results = _records(frame, AUDIT_RESULT_COLUMNS, user_id)
+        audited_at = utcnow()
+        for row in results:
+            row["audited_at"] = audited_at
+        bulk_upsert(session, AuditResult, results, ["order_id", "item_id"], batch_size)
+        session.commit()
+    return len(frame)
+
+def _audit_windows(date_from: datetime, date_to: datetime) -> Iterator[Tuple[datetime, datetime]]:
+    step = timedelta(hours=settings.AUDIT_CHECKPOINT_WINDOW_HOURS)
+    start = date_from
+    while start < date_to:
+        end = min(start + step, date_to)
+        yield start, end
+        start = end
+
+def _resume_range(
+    state: Dict[str, Any], date_from: datetime, date_to: datetime, explicit: bool,
+) -> Optional[Tuple[datetime, datetime, datetime]]:
+    """
+    (date_from, date_to, resume_from) continuing a failed audit's checkpoint,
+    or None to start over. An explicit range only resumes the same range. A
+    rolling range (`days`) resumes a saved range it overlaps or adjoins and
+    covers both, so a failed window is finished without skipping the new one.
+    """
+    saved_from, saved_to, done_until = (datetime.fromisoformat(state[k]) for k in ("date_from", "date_to", "done_until"))
+    if explicit:
+        if (saved_from, saved_to) != (date_from, date_to):
+            return None
+        return saved_from, saved_to, done_until
+    if saved_from > date_to or date_from > saved_to:
+        return None
+    # Only skip the saved progress if nothing requested lies before it
+    resume_from = done_until if date_from >= saved_from else date_from
+    return min(saved_from, date_from), max(saved_to, date_to), resume_from
+
+def run_user_audit(
+    user_id: int,
+    session: Session,
+    days: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> int:
+    """
+    Audit a seller's orders (the last `days`, or an explicit date range) and
+    persist the results batch by batch. Returns the number of audited lines.
+
+    The range is audited in windows of AUDIT_CHECKPOINT_WINDOW_HOURS, with a
+    checkpoint after each one. If a previous audit failed, it is resumed from
+    its last completed window when its range matches (see _resume_range).
+    """
+    setup = setup_client(session, user_id)
+    if setup is None:
+        raise ValueError(f"Cannot audit user_id={user_id}: user or credentials not found")
+    user, _, client = setup
+
+    explicit = date_from is not None
+    if date_from is None:
+        date_to = date_to or datetime.now(timezone.utc)
+        date_from = date_to - timedelta(days=days or 30)
+    date_to = date_to or datetime.now(timezone.utc)
+
+    resume_from = date_from
+    state = load_checkpoint(session, user_id, AUDIT_CHECKPOINT_KIND, max_age=settings.CHECKPOINT_MAX_AGE)
+    if state:
+        resumed = _resume_range(state, date_from, date_to, explicit)
+        if resumed is not None:
+            date_from, date_to, resume_from = resumed
+            logger.info(f"Resuming audit for user_id={user_id} from {resume_from} (through {date_to})")
+        else:
+            logger.warning(f"Audit checkpoint for user_id={user_id} ({state['date_from']} to {state['date_to']}) "
+                           f"doesn't match the requested range, starting over")
+
+    rate_card = RateCard.load(auditor_settings.RATE_CARD_PATH) if auditor_settings.RATE_CARD_PATH else None
+    # Truth comes from the seller's sku_truth rows, queried per batch
+    auditor = MeliAuditor(
+        client,
+        rate_card=rate_card,
+        truth_loader=lambda skus: load_sku_truth_for(session, user_id, skus),
+    )
+
+    total = 0
+    logger.info(f"Auditing orders for user_id={user_id} (seller {user.meli_user_id})")
+    for start, end in _audit_windows(resume_from, date_to):
+        for frame in auditor.iter_audit_frames(date_from=start, date_to=end, seller_id=user.meli_user_id):
+            frame = auditor.calculate_money_lost(frame)
+            total += persist_audit_frame(session, user_id, frame)
+        save_checkpoint(session, user_id, AUDIT_CHECKPOINT_KIND, {
+            "date_from": date_from.isoformat(), "date_to": date_to.isoformat(), "done_until": end.isoformat(),
+        })
+    clear_checkpoint(session, user_id, AUDIT_CHECKPOINT_KIND)
+    logger.info(f"Audited {total} order lines for user_id={user_id}")
+    return total
+
+def audit_results_query(
+    user_id: int,
+    sku: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_money_lost: Optional[float] = None,
+) -> SelectOfScalar[AuditResult]:
+    statement = select(AuditResult).where(AuditResult.user_id == user_id)
+    if sku is not None:
+        statement = statement.where(AuditResult.sku == sku)
+    if status is not None:
+        statement = statement.where(AuditResult.status == status)
+    if date_from is not None:
+        statement = statement.where(AuditResult.date_created >= date_from)
+    if date_to is not None:
+        statement = statement.where(AuditResult.date_created < date_to)
+    if min_money_lost is not None:
+        statement = statement.where(AuditResult.money_lost_estimate >= min_money_lost)
+    return statement
+
+def iter_audit_results(session: Session, statement: SelectOfScalar[AuditResult], chunk_size: int = 5000) -> Iterator[List[AuditResult]]:
+    """Walk a results query in id order, one keyset page at a time."""
+    last_id = 0
+    while True:
+        chunk = session.exec(
+            statement.where(AuditResult.id > last_id).order_by(AuditResult.id).limit(chunk_size)
+        ).all()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+        session.expunge_all()  # Don't keep every page in the identity map
@@ -0,0 +1,132 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlmodel import Session, select
+from src.app.core.config import settings
+from src.app.core.db import engine, session_scope
+from src.app.models.audit_run import (
+    RUN_DONE, RUN_FAILED, RUN_PENDING, RUN_RUNNING, AuditRun, AuditRunSeller,
+)
+from src.app.models.credential import MeliCredential
+from src.app.models.job import utcnow
+from src.app.models.user import User
+from src.app.services.audit import run_user_audit
+from src.meli_auditor import tracing
+from src.meli_auditor.rate_limit import share_app_quota
+
+logger = logging.getLogger(__name__)
+
+def get_unfinished_run(session: Session) -> Optional[AuditRun]:
+    return session.exec(
+        select(AuditRun).where(AuditRun.status == RUN_RUNNING).order_by(AuditRun.id.desc())
+    ).first()
+
+def create_audit_run(session: Session, days: Optional[int] = None) -> AuditRun:
+    """Start a run over the last `days` for every active seller with credentials."""
+    date_to = datetime.now(timezone.utc)
+    run = AuditRun(date_from=date_to - timedelta(days=days or 30), date_to=date_to)
+    session.add(run)
+    session.flush()
+
+    user_ids = session.exec(
+        select(User.id).join(MeliCredential, MeliCredential.user_id == User.id)
+        .where(User.is_active == True)  # noqa: E712
+        .distinct()
+    ).all()
+    for user_id in sorted(user_ids):
+        session.add(AuditRunSeller(run_id=run.id, user_id=user_id))
+    session.commit()
+    session.refresh(run)
+    logger.info(f"Audit run {run.id}: {len(user_ids)} sellers, {run.date_from} to {run.date_to}")
+    return run
+
+def _init_process(processes: int) -> None:
+    # Connections inherited from the parent must not be reused in the child
+    engine.dispose(close=False)
+    # Each seller runs in one process, so only the app-wide quota needs splitting
+    share_app_quota(processes)
+    # One trace file per pool process when TRACE_PATH is set (see tracing.configure)
+    tracing.configure()
+
+def _audit_seller(checkpoint_id: int) -> tuple:
+    """
+    Audit one seller of a run (in a pool process) and record the outcome on
+    its checkpoint row. Errors are recorded, never raised, so one seller's
+    failure doesn't affect the others.
+    """
+    with session_scope() as session:
+        checkpoint = session.get(AuditRunSeller, checkpoint_id)
+        run = session.get(AuditRun, checkpoint.run_id)
+        checkpoint.status = RUN_RUNNING
+        checkpoint.attempts += 1
+        checkpoint.started_at = utcnow()
+        checkpoint.error = None
+        session.add(checkpoint)
+        session.commit()
+        user_id, date_from, date_to = checkpoint.user_id, run.date_from, run.date_to
+
+        try:
+            lines = run_user_audit(user_id, session, date_from=date_from, date_to=date_to)
+        except Exception as e:
+            logger.error(f"Audit of user_id={user_id} failed: {e}")
+            session.rollback()
+            checkpoint = session.get(AuditRunSeller, checkpoint_id)
+            checkpoint.status = RUN_FAILED
+            checkpoint.error = str(e) or e.__class__.__name__
+        else:
+            checkpoint = session.get(AuditRunSeller, checkpoint_id)
+            checkpoint.status = RUN_DONE
+            checkpoint.lines = lines
+        checkpoint.finished_at = utcnow()
+        session.add(checkpoint)
+        session.commit()
+        return user_id, checkpoint.status
+
+def run_audit_run(run_id: int, processes: Optional[int] = None, retry_failed: bool = False) -> AuditRun:
+    """
+    Audit every seller of a run that isn't done yet, `processes` sellers at a
+    time. Sellers left running by an interrupted run are audited again
+    (results are upserted, so this is safe); failed ones only with retry_failed.
+    """
+    processes = processes or settings.AUDIT_RUN_PROCESSES
+    statuses: List[str] = [RUN_PENDING, RUN_RUNNING] + ([RUN_FAILED] if retry_failed else [])
+    with session_scope() as session:
+        run = session.get(AuditRun, run_id)
+        if run is None:
+            raise ValueError(f"Audit run {run_id} not found")
+        run.status = RUN_RUNNING
+        run.finished_at = None
+        session.add(run)
+        session.commit()
+        checkpoint_ids = session.exec(
+            select(AuditRunSeller.id)
+            .where(AuditRunSeller.run_id == run_id, AuditRunSeller.status.in_(statuses))
+            .order_by(AuditRunSeller.id)
+        ).all()
+    logger.info(f"Audit run {run_id}: {len(checkpoint_ids)} sellers to audit with {processes} processes")
+
+    if checkpoint_ids:
+        workers = min(processes, len(checkpoint_ids))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_process, initargs=(workers,)) as executor:
+            futures = [executor.submit(_audit_seller, checkpoint_id) for checkpoint_id in checkpoint_ids]
+            for future in as_completed(futures):
+                try:
+                    user_id, status = future.result()
+                    logger.info(f"Audit run {run_id}: user_id={user_id} {status}")
+                except Exception as e:
+                    # Only reached if the pool process itself died; the seller stays
+                    # marked running and is picked up again on resume.
+                    logger.error(f"Audit run {run_id}: seller process failed: {e}")
+
+    with session_scope() as session:
+        run = session.get(AuditRun, run_id)
+        remaining = session.exec(
+            select(AuditRunSeller.id).where(AuditRunSeller.run_id == run_id, AuditRunSeller.status != RUN_DONE)
+        ).first()
+        run.status = RUN_DONE if remaining is None else RUN_FAILED
+        run.finished_at = utcnow()
+        session.add(run)
+        session.commit()
+        session.refresh(run)
+        return run
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, delete, select
+from src.app.models.checkpoint import Checkpoint
+from src.app.models.job import utcnow
+
+def load_checkpoint(session: Session, user_id: int, kind: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Saved state, or None if there is none (or it is older than max_age seconds)."""
+    checkpoint = session.exec(
+        select(Checkpoint).where(Checkpoint.user_id == user_id, Checkpoint.kind == kind)
+    ).first()
+    if checkpoint is None:
+        return None
+    if max_age is not None and checkpoint.updated_at < utcnow() - timedelta(seconds=max_age):
+        return None
+    return checkpoint.state
+
+def save_checkpoint(session: Session, user_id: int, kind: str, state: Dict[str, Any]) -> None:
+    stmt = pg_insert(Checkpoint).values(user_id=user_id, kind=kind, state=state, updated_at=utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "kind"],
+        set_={"state": stmt.excluded.state, "updated_at": stmt.excluded.updated_at},
+    )
+    session.execute(stmt)
+    session.commit()
+
+def clear_checkpoint(session: Session, user_id: int, kind: str) -> None:
+    session.exec(delete(Checkpoint).where(Checkpoint.user_id == user_id, Checkpoint.kind == kind))
+    session.commit()
+
+class ScanProgress:
+    """
+    Thread-safe progress through an ordered id scan (e.g. a seller's item scan),
+    kept small enough to checkpoint often whatever the catalog size: the
+    length of the scan prefix that is fully done, a hash of the ids in it,
+    and the few chunks done out of order past it.
+
+    Chunks are reported with done(start, ids), `start` being the position of
+    their first id in the scan. On resume, skip_prefix() gets the first
+    `resume_position` ids of the new scan and only skips them if they hash
+    the same, i.e. the scan order hasn't changed.
+    """
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self._saved_state = state
+        self.resume_position: int = state.get("position", 0)
+        self._resume_hash: Optional[str] = state.get("prefix_hash")
+        # Ids done out of order by the interrupted run; skipped wherever they appear
+        self._skip: set = set(state.get("done_after", []))
+        self._verified: Optional[bool] = None if self.resume_position else False
+        self.position = 0
+        self._hash = hashlib.sha1()
+        self._pending: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, item_id: str) -> bool:
+        with self._lock:
+            return item_id in self._skip
+
+    def skip_prefix(self, ids: List[str]) -> bool:
+        """Mark the resumed prefix done if it matches the saved one; False if it doesn't."""
+        if _ids_hash(hashlib.sha1(), ids) != self._resume_hash:
+            self._verified = False
+            return False
+        self.done(0, ids)
+        self._verified = True
+        return True
+
+    def done(self, start: int, ids: List[str]) -> None:
+        with self._lock:
+            self._skip.difference_update(ids)
+            self._pending[start] = ids
+            while self.position in self._pending:
+                chunk = self._pending.pop(self.position)
+                _ids_hash(self._hash, chunk)
+                self.position += len(chunk)
+
+    def to_state(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._verified is None:
+                # Still re-reading the resumed prefix: nothing new to save
+                return self._saved_state
+            done_after = self._skip.union(*self._pending.values())
+            return {"position": self.position, "prefix_hash": self._hash.hexdigest(), "done_after": sorted(done_after)}
+
+def _ids_hash(digest: Any, ids: List[str]) -> str:
+    for item_id in ids:
+        digest.update(item_id.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
@@ -0,0 +1,168 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, update
+from src.app.core.config import settings
+from src.app.core.db import session_scope
+from src.app.models.job import (
+    ACTIVE_JOB_STATUSES, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, Job, utcnow,
+)
+from src.app.services.audit import run_user_audit
+from src.app.services.sync import sync_item_changes, sync_user_items
+
+logger = logging.getLogger(__name__)
+
+def _sync_mode(params: Dict) -> str:
+    # Jobs queued before sync modes existed carry {"full": bool}
+    if "mode" in params:
+        return params["mode"]
+    return "full" if params.get("full") else "reconcile"
+
+# kind -> callable(session, job); raising marks the job as failed
+JOB_HANDLERS: Dict[str, Callable[[Session, Job], None]] = {
+    "sync_items": lambda session, job: sync_user_items(job.user_id, session, mode=_sync_mode(job.params)),
+    "sync_item_changes": lambda session, job: sync_item_changes(job.user_id, session),
+    "audit": lambda session, job: run_user_audit(job.user_id, session, days=job.params.get("days")),
+}
+
+def get_active_job(session: Session, user_id: int, kind: str) -> Optional[Job]:
+    return session.exec(
+        select(Job).where(Job.user_id == user_id, Job.kind == kind, Job.status.in_(ACTIVE_JOB_STATUSES))
+    ).first()
+
+def enqueue_job(session: Session, user_id: int, kind: str, params: Optional[Dict] = None) -> tuple[Job, bool]:
+    """
+    Queue a job unless the seller already has one of this kind queued or running.
+    Returns (job, created).
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    existing = get_active_job(session, user_id, kind)
+    if existing:
+        return existing, False
+
+    job = Job(user_id=user_id, kind=kind, params=params or {})
+    session.add(job)
+    try:
+        session.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent enqueue; the unique index kept one
+        session.rollback()
+        return get_active_job(session, user_id, kind), False
+    session.refresh(job)
+    return job, True
+
+def claim_job(session: Session, worker_id: str) -> Optional[Job]:
+    """
+    Atomically take the oldest queued job. SKIP LOCKED lets many workers
+    poll the same table without blocking on each other's claims.
+    """
+    job = session.exec(
+        select(Job)
+        .where(Job.status == JOB_QUEUED)
+        .order_by(Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if not job:
+        session.rollback()
+        return None
+
+    job.status = JOB_RUNNING
+    job.worker_id = worker_id
+    job.attempts += 1
+    job.started_at = utcnow()
+    job.heartbeat_at = job.started_at
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+def finish_job(session: Session, job_id: int, worker_id: str, error: Optional[str] = None) -> bool:
+    """
+    Record the outcome of a job held by `worker_id`. Returns False, changing
+    nothing, when the worker lost the lease: the job was requeued after missed
+    heartbeats and may be running elsewhere.
+    """
+    result = session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JOB_RUNNING, Job.worker_id == worker_id)
+        .values(status=JOB_FAILED if error else JOB_DONE, error=error, finished_at=utcnow())
+    )
+    session.commit()
+    return result.rowcount > 0
+
+class JobHeartbeat(threading.Thread):
+    """
+    Bumps a running job's heartbeat_at every JOB_HEARTBEAT_INTERVAL seconds,
+    from its own session, so long jobs are not mistaken for orphaned ones.
+    """
+    def __init__(self, job_id: int, worker_id: str):
+        super().__init__(name=f"job-heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(settings.JOB_HEARTBEAT_INTERVAL):
+            try:
+                with session_scope() as session:
+                    result = session.execute(
+                        update(Job)
+                        .where(Job.id == self.job_id, Job.status == JOB_RUNNING, Job.worker_id == self.worker_id)
+                        .values(heartbeat_at=utcnow())
+                    )
+                    session.commit()
+            except Exception as e:
+                logger.error(f"Heartbeat for job {self.job_id} failed: {e}")
+                continue
+            if result.rowcount == 0:
+                logger.warning(f"Job {self.job_id} is no longer held by worker {self.worker_id}")
+                return
+
+def run_job(session: Session, job: Job, worker_id: str) -> None:
+    # Read up front: handlers commit, which expires `job`
+    job_id = job.id
+    logger.info(f"Running job {job_id} ({job.kind}) for user_id={job.user_id}")
+    error = None
+    heartbeat = JobHeartbeat(job_id, worker_id)
+    heartbeat.start()
+    try:
+        JOB_HANDLERS[job.kind](session, job)
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        session.rollback()
+        error = str(e) or e.__class__.__name__
+    finally:
+        heartbeat.stop()
+    if not finish_job(session, job_id, worker_id, error=error):
+        logger.warning(f"Worker {worker_id} lost the lease on job {job_id}; its outcome was not recorded")
+    elif error is None:
+        logger.info(f"Job {job_id} done")
+
+def requeue_stale_jobs(session: Session) -> int:
+    """Put back running jobs whose worker stopped heartbeating for JOB_STALE_AFTER seconds."""
+    cutoff = utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER)
+    result = session.execute(
+        update(Job)
+        .where(Job.status == JOB_RUNNING, func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff)
+        .values(status=JOB_QUEUED, worker_id=None, heartbeat_at=None)
+    )
+    session.commit()
+    return result.rowcount
+
+def list_jobs(session: Session, user_id: Optional[int] = None, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+    statement = select(Job).order_by(Job.id.desc()).limit(limit)
+    if user_id is not None:
+        statement = statement.where(Job.user_id == user_id)
+    if status is not None:
+        statement = statement.where(Job.status == status)
+    return list(session.exec(statement).all())
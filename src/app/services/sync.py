@@ -1,119 +1,456 @@
+import hashlib
+import itertools
+import json
 import logging
-from sqlmodel import Session, select
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, delete, select
+from src.app.core.config import settings
 from src.app.models.user import User
 from src.app.models.credential import MeliCredential
 from src.app.models.item import Item
-from src.meli_auditor.client import MeliClient
-from src.meli_auditor.auth import MeliAuth
+from src.app.models.item_change import ItemChange
+from src.app.models.job import utcnow
+from src.app.services.checkpoints import ScanProgress, clear_checkpoint, load_checkpoint, save_checkpoint
+from src.meli_auditor import metrics
+from src.meli_auditor.client import ITEMS_SEARCH_MAX_OFFSET, MULTIGET_CHUNK_SIZE, MeliClient, batched
+from src.app.services.tokens import DBMeliAuth
+from src.app.services.upserts import bulk_upsert
 
 logger = logging.getLogger(__name__)
 
-class DBMeliAuth(MeliAuth):
+ITEM_UPDATE_COLUMNS = [
+    "user_id", "title", "price", "permalink", "thumbnail", "status", "official_store_id", "dimensions",
+    "last_updated", "content_hash",
+]
+# Cheap multiget projection used to detect which items changed since the last sync
+CHANGE_ATTRIBUTES = ["id", "last_updated"]
+
+def _content_hash(row: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _item_row(details: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    # We map the details to our Item model
+    row = {
+        "id": details.get("id"),
+        "user_id": user_id,
+        "title": details.get("title"),
+        "price": details.get("price"),
+        "permalink": details.get("permalink"),
+        "thumbnail": details.get("thumbnail"),
+        "status": details.get("status"),
+        "official_store_id": details.get("official_store_id"),
+        # dimensions is inside 'shipping' -> 'dimensions' usually, or separate?
+        # Actually, MeLi 'dimensions' field is often null at top level, sometimes in shipping.
+        # Common field is 'shipping.dimensions'.
+        "dimensions": (details.get("shipping") or {}).get("dimensions"),
+        "last_updated": details.get("last_updated"),
+    }
+    row["content_hash"] = _content_hash(row)
+    return row
+
+def upsert_items(session: Session, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> Tuple[int, int]:
     """
-    Adapter to use Database for token storage instead of local file.
+    Bulk upsert items with INSERT ... ON CONFLICT (id) DO UPDATE, committing
+    after each batch. Rows whose content hash is unchanged are not rewritten.
+    Returns (rows processed, rows inserted or updated).
     """
-    def __init__(self, session: Session, credential: MeliCredential):
-        # Skip super().__init__ to avoid loading from file which might not exist or be wrong
-        self.access_token = credential.access_token
-        self.refresh_token = credential.refresh_token
-        self.expires_at = credential.expires_at
-        
-        self.db_session = session
-        self.credential = credential
-
-    def _save_tokens(self) -> None:
-        """
-        Override to save tokens to the database.
-        """
-        logger.info("Refreshing tokens in Database...")
-        self.credential.access_token = self.access_token
-        self.credential.refresh_token = self.refresh_token
-        self.credential.expires_at = self.expires_at
-        
-        self.db_session.add(self.credential)
-        self.db_session.commit()
-        self.db_session.refresh(self.credential)
-        logger.info("Tokens updated in DB.")
-
-    def _load_tokens(self) -> None:
-        # Already loaded in __init__
-        pass
-
-def sync_user_items(user_id: int, session: Session):
+    return bulk_upsert(
+        session, Item, rows, ["id"], batch_size or settings.SYNC_BATCH_SIZE,
+        update_columns=ITEM_UPDATE_COLUMNS,
+        where=lambda excluded: Item.content_hash.is_distinct_from(excluded.content_hash),
+        commit=True,
+    )
+
+_DONE = object()  # end-of-stream marker between pipeline stages
+SYNC_CHECKPOINT_KIND = "sync_items"
+# Kept between syncs: {"since": start of the last sync, "reconciled_at": start of the last scan}
+SYNC_WATERMARK_KIND = "sync_items_watermark"
+SYNC_MODES = ("incremental", "reconcile", "full")
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    # Blocks while the queue is full (backpressure), but gives up if the pipeline stops
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _DONE
+
+def _changed_ids(client: MeliClient, chunk: List[str], known: Dict[str, Optional[str]]) -> List[str]:
+    # Items that are new or whose last_updated moved since the stored copy
+    stamps = client.get_items_details(chunk, attributes=CHANGE_ATTRIBUTES)
+    return [s["id"] for s in stamps if s.get("id") not in known or known[s["id"]] != s.get("last_updated")]
+
+def _stream_items(
+    client: MeliClient,
+    session: Session,
+    user_id: int,
+    meli_user_id: int,
+    known: Optional[Dict[str, Optional[str]]] = None,
+    progress: Optional[ScanProgress] = None,
+    checkpoint: Optional[Callable[[], None]] = None,
+) -> Tuple[int, int]:
     """
-    Synchronizes user items from Mercado Libre to the local database.
+    Run the item sync as a staged pipeline:
+      ID pages -> multiget chunks of 20 -> detail fetch workers -> batched DB writes.
+    Stages are connected by bounded queues, so the scan, the detail requests
+    and the DB writes overlap while memory stays at a few batches regardless
+    of catalog size. DB writes happen on the calling thread, which owns the session.
+
+    With `known` (item id -> stored last_updated), each chunk is first checked
+    with a lightweight multiget and full details are only fetched for new or
+    modified items.
+
+    Chunks are reported to `progress` once written (or found unchanged), and
+    `checkpoint` is called every SYNC_CHECKPOINT_INTERVAL seconds to persist
+    it. When resuming, the scan prefix the interrupted run finished is re-read
+    and skipped if the scan order is unchanged.
+    Returns (rows processed, rows inserted or updated).
     """
-    logger.info(f"Starting item sync for user_id={user_id}")
-    
+    progress = progress if progress is not None else ScanProgress()
+    workers = settings.SYNC_FETCH_WORKERS
+    chunks: queue.Queue = queue.Queue(maxsize=settings.SYNC_QUEUE_SIZE)
+    details: queue.Queue = queue.Queue(maxsize=settings.SYNC_QUEUE_SIZE)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def scan_pages() -> Iterator[List[str]]:
+        for page in client.iter_items_ids(meli_user_id):
+            metrics.count("sync", "scanned", len(page))
+            yield page
+
+    def scan_ids() -> None:
+        try:
+            position = 0
+            pages = scan_pages()
+            if progress.resume_position:
+                # Re-read the prefix the interrupted run finished, then skip it if it is unchanged
+                prefix: List[str] = []
+                for page in pages:
+                    prefix.extend(page)
+                    if len(prefix) >= progress.resume_position:
+                        break
+                if progress.skip_prefix(prefix[:progress.resume_position]):
+                    logger.info(f"Skipping {progress.resume_position} items synced by the interrupted run")
+                    position = progress.resume_position
+                    prefix = prefix[position:]
+                else:
+                    logger.warning("Item scan order changed since the interrupted run; re-checking every item")
+                pages = itertools.chain([prefix], pages)
+            for page in pages:
+                for i in range(0, len(page), MULTIGET_CHUNK_SIZE):
+                    if not _put(chunks, (position + i, page[i:i + MULTIGET_CHUNK_SIZE]), stop):
+                        return
+                position += len(page)
+            logger.info(f"Found {position} items.")
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            for _ in range(workers):
+                _put(chunks, _DONE, stop)
+
+    def fetch_details() -> None:
+        try:
+            while (received := _get(chunks, stop)) is not _DONE:
+                start, ids = received
+                # Ids the interrupted run wrote out of order are not fetched again
+                chunk = [item_id for item_id in ids if item_id not in progress]
+                if known is not None and chunk:
+                    with metrics.stage("sync", "changed_ids"):
+                        chunk = _changed_ids(client, chunk, known)
+                rows = []
+                if chunk:
+                    with metrics.stage("sync", "details"):
+                        details_chunk = client.get_items_details(chunk)
+                    with metrics.stage("sync", "build_rows"):
+                        rows = [_item_row(d, user_id) for d in details_chunk]
+                # Pass the ids along even with no rows, so unchanged items count as processed
+                if not _put(details, (start, ids, rows), stop):
+                    return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(details, _DONE, stop)
+
+    threads = [threading.Thread(target=scan_ids, name="sync-scan", daemon=True)]
+    threads += [threading.Thread(target=fetch_details, name=f"sync-fetch-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    count = 0
+    changed = 0
+    batch: List[Dict[str, Any]] = []
+    batch_chunks: List[Tuple[int, List[str]]] = []
+    last_checkpoint = time.monotonic()
+
+    def flush() -> None:
+        nonlocal count, changed, batch, batch_chunks, last_checkpoint
+        if batch:
+            with metrics.stage("sync", "db_write"):
+                written, updated = upsert_items(session, batch)
+            count, changed = count + written, changed + updated
+            metrics.count("sync", "written", written)
+            metrics.count("sync", "changed", updated)
+        for start, ids in batch_chunks:
+            progress.done(start, ids)
+            metrics.count("sync", "processed", len(ids))
+        batch, batch_chunks = [], []
+        if checkpoint is not None and time.monotonic() - last_checkpoint >= settings.SYNC_CHECKPOINT_INTERVAL:
+            checkpoint()
+            last_checkpoint = time.monotonic()
+
+    try:
+        finished = 0
+        while finished < workers:
+            received = _get(details, stop)
+            if received is _DONE:
+                if stop.is_set():
+                    break
+                finished += 1
+                continue
+            start, ids, rows = received
+            batch.extend(rows)
+            batch_chunks.append((start, ids))
+            if len(batch) >= settings.SYNC_BATCH_SIZE or len(batch_chunks) * MULTIGET_CHUNK_SIZE >= settings.SYNC_BATCH_SIZE * 10:
+                flush()
+
+        if batch_chunks and not errors:
+            flush()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return count, changed
+
+def setup_client(session: Session, user_id: int) -> Optional[Tuple[User, DBMeliAuth, MeliClient]]:
     # 1. Get Credential
     credential = session.exec(select(MeliCredential).where(MeliCredential.user_id == user_id)).first()
     if not credential:
         logger.error(f"No credentials found for user_id={user_id}")
-        return
+        return None
+
+    # We need the User model to get the meli_user_id.
+    user = session.get(User, user_id)
+    if not user:
+        logger.error(f"User not found for user_id={user_id}")
+        return None
 
-    # 2. Setup Client with DB Auth
+    # 2. Setup Client with DB Auth (rate limited per seller as well as per app).
+    # No response cache: cached item bodies would hide changes from the sync.
     auth_adapter = DBMeliAuth(session, credential)
-    client = MeliClient(auth=auth_adapter)
+    client = MeliClient(auth=auth_adapter, seller_id=user.meli_user_id)
+    return user, auth_adapter, client
 
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    # MeLi timestamps look like 2024-05-06T12:34:56.000Z
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _recently_updated_ids(client: MeliClient, meli_user_id: int, since: datetime) -> Optional[List[str]]:
+    """
+    Ids of the items updated at or after `since`, newest first. The search is
+    walked by last_updated and stops at the first older item, so this costs
+    calls per changed item, not per catalog item. None when more items
+    changed than offset paging can reach.
+    """
+    ids: List[str] = []
+    scanned = 0
+    for page in client.iter_recently_updated_ids(meli_user_id):
+        scanned += len(page)
+        with metrics.stage("sync", "changed_ids"):
+            stamps = client.get_items_details(page, attributes=CHANGE_ATTRIBUTES, max_workers=settings.SYNC_FETCH_WORKERS)
+        for stamp in stamps:
+            updated = _parse_timestamp(stamp.get("last_updated"))
+            if updated is not None and updated < since:
+                return ids
+            ids.append(stamp["id"])
+    # Ran out of results: fine if that was the whole catalog, not if paging hit its cap
+    return ids if scanned <= ITEMS_SEARCH_MAX_OFFSET else None
+
+def _sync_ids(client: MeliClient, session: Session, user_id: int, item_ids: List[str]) -> Tuple[int, int]:
+    """Fetch and upsert the given items in SYNC_BATCH_SIZE batches, in order."""
+    count = 0
+    changed = 0
+    for chunk in batched(item_ids, settings.SYNC_BATCH_SIZE):
+        with metrics.stage("sync", "details"):
+            details = client.get_items_details(chunk, max_workers=settings.SYNC_FETCH_WORKERS)
+        with metrics.stage("sync", "db_write"):
+            written, updated = upsert_items(session, [_item_row(d, user_id) for d in details])
+        count, changed = count + written, changed + updated
+        metrics.count("sync", "written", written)
+        metrics.count("sync", "changed", updated)
+    return count, changed
+
+def _sync_recent_items(client: MeliClient, session: Session, user: User) -> Optional[Tuple[int, int]]:
+    """
+    Incremental sync: every item updated since the stored watermark (less
+    SYNC_UPDATED_OVERLAP for clock skew), plus the notification change feed.
+    None when a reconcile scan is due instead: no watermark yet, the last
+    reconcile is older than SYNC_RECONCILE_INTERVAL, or too many items changed.
+    """
+    watermark = load_checkpoint(session, user.id, SYNC_WATERMARK_KIND)
+    if not watermark:
+        return None
+    since = _parse_timestamp(watermark.get("since"))
+    reconciled_at = _parse_timestamp(watermark.get("reconciled_at"))
+    now = utcnow()
+    if since is None or reconciled_at is None or now - reconciled_at > timedelta(seconds=settings.SYNC_RECONCILE_INTERVAL):
+        return None
+
+    ids = _recently_updated_ids(client, user.meli_user_id, since - timedelta(seconds=settings.SYNC_UPDATED_OVERLAP))
+    if ids is None:
+        return None
+    # Oldest first, so items written before a failure are never newer than the ones left out
+    count, changed = _sync_ids(client, session, user.id, ids[::-1])
+    save_checkpoint(session, user.id, SYNC_WATERMARK_KIND, {**watermark, "since": now.isoformat()})
+
+    feed_count, feed_changed = sync_item_changes(user.id, session, client)
+    return count + feed_count, changed + feed_changed
+
+def sync_user_items(user_id: int, session: Session, mode: str = "incremental"):
+    """
+    Synchronizes user items from Mercado Libre to the local database.
+      incremental: only items updated since the last sync (walked by last_updated)
+          and items from the notification feed; falls back to reconcile when due.
+      reconcile: scans every item id and fetches details for new or modified ones
+          (by last_updated); the periodic safety net for missed changes.
+      full: re-pulls every item.
+    Scans are checkpointed, so a re-run after a failure skips the items
+    the failed run already wrote.
+    """
+    if mode not in SYNC_MODES:
+        raise ValueError(f"Unknown sync mode: {mode}")
+    logger.info(f"Starting item sync for user_id={user_id} (mode={mode})")
+
+    setup = setup_client(session, user_id)
+    if setup is None:
+        raise ValueError(f"Cannot sync user_id={user_id}: user or credentials not found")
+    user, auth_adapter, client = setup
+
+    progress: Optional[ScanProgress] = None
     try:
-        # 3. Fetch all Item IDs
-        # We need the User model to get the meli_user_id.
-        user = session.get(User, user_id)
-        if not user:
-            logger.error(f"User not found for user_id={user_id}")
-            return
-            
         # The client.get_items_ids actually expects the MeLi User ID (numeric usually).
-        # client.py says: get_items_ids(user_id: int). 
         # The URL is /users/{user_id}/items/search. This implies MeLi user ID.
         meli_user_id = user.meli_user_id
-        
+
+        # Refresh up front if needed, so the fetch threads don't all wait on it
+        auth_adapter.get_token()
+
+        if mode == "incremental":
+            synced = _sync_recent_items(client, session, user)
+            if synced is not None:
+                count, changed = synced
+                logger.info(f"Successfully synced {count} updated items for user_id={user_id} ({changed} changed)")
+                return
+            logger.info(f"Reconcile scan due for user_id={user_id}")
+            mode = "reconcile"
+
+        started = utcnow()
+        known = None
+        if mode == "reconcile":
+            known = dict(session.exec(select(Item.id, Item.last_updated).where(Item.user_id == user_id)).all())
+
+        # Resume an interrupted sync: the part of the scan it already wrote is skipped
+        state = load_checkpoint(session, user_id, SYNC_CHECKPOINT_KIND, max_age=settings.CHECKPOINT_MAX_AGE)
+        progress = ScanProgress(state)
+        if state:
+            logger.info(f"Resuming item sync for user_id={user_id} from checkpoint")
+
         logger.info(f"Fetching items for MeLi User ID: {meli_user_id}")
-        item_ids = client.get_items_ids(meli_user_id)
-        logger.info(f"Found {len(item_ids)} items.")
-        
-        if not item_ids:
-            return
-
-        # 4. Fetch Details
-        # The client handles chunking internally now.
-        items_details = client.get_items_details(item_ids)
-        
-        # 5. Upsert Items
-        count = 0
-        for details in items_details:
-            # We map the details to our Item model
-            item_data = {
-                "id": details.get("id"),
-                "user_id": user_id,
-                "title": details.get("title"),
-                "price": details.get("price"),
-                "permalink": details.get("permalink"),
-                "thumbnail": details.get("thumbnail"),
-                "status": details.get("status"),
-                "official_store_id": details.get("official_store_id"),
-                # dimensions is inside 'shipping' -> 'dimensions' usually, or separate?
-                # Actually, MeLi 'dimensions' field is often null at top level, sometimes in shipping.
-                # Let's check a standard response structure or just safely get it.
-                # Common field is 'shipping.dimensions'.
-                "dimensions": details.get("shipping", {}).get("dimensions")
-            }
-            
-            # Use upsert logic
-            existing_item = session.get(Item, item_data["id"])
-            if existing_item:
-                for k, v in item_data.items():
-                    setattr(existing_item, k, v)
-                session.add(existing_item)
-            else:
-                new_item = Item(**item_data)
-                session.add(new_item)
-            
-            count += 1
-        
-        session.commit()
-        logger.info(f"Successfully synced {count} items for user_id={user_id}")
+        count, changed = _stream_items(
+            client, session, user_id, meli_user_id, known, progress,
+            checkpoint=lambda: save_checkpoint(session, user_id, SYNC_CHECKPOINT_KIND, progress.to_state()),
+        )
+        clear_checkpoint(session, user_id, SYNC_CHECKPOINT_KIND)
+        # Anything updated after the scan started is picked up by the next incremental sync
+        save_checkpoint(session, user_id, SYNC_WATERMARK_KIND, {
+            "since": started.isoformat(), "reconciled_at": started.isoformat(),
+        })
+        logger.info(f"Successfully synced {count} items for user_id={user_id} ({changed} new or changed)")
 
     except Exception as e:
+        # Batches committed so far are kept; only the failing one is discarded
+        session.rollback()
         logger.error(f"Error syncing items for user_id={user_id}: {e}")
-        # Optionally re-raise if we want the background task to fail visibly, but usually logging is enough for async workers
+        if progress is not None:
+            try:
+                save_checkpoint(session, user_id, SYNC_CHECKPOINT_KIND, progress.to_state())
+            except Exception as checkpoint_error:
+                session.rollback()
+                logger.error(f"Could not save sync checkpoint for user_id={user_id}: {checkpoint_error}")
+        # Re-raise so the job worker records the failure
+        raise
+
+def record_item_change(session: Session, user_id: int, item_id: str) -> None:
+    """Add an item to the seller's pending change feed (from MeLi 'items' notifications)."""
+    stmt = pg_insert(ItemChange).values(user_id=user_id, item_id=item_id, received_at=utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "item_id"],
+        set_={"received_at": stmt.excluded.received_at},
+    )
+    session.execute(stmt)
+    session.commit()
+
+def sync_item_changes(user_id: int, session: Session, client: Optional[MeliClient] = None) -> Tuple[int, int]:
+    """
+    Re-fetch the items in the seller's change feed until it is empty.
+    A change row is only removed if it wasn't notified again while its item
+    was being fetched, so no notification is lost.
+    Returns (rows processed, rows inserted or updated).
+    """
+    if client is None:
+        setup = setup_client(session, user_id)
+        if setup is None:
+            raise ValueError(f"Cannot sync user_id={user_id}: user or credentials not found")
+        client = setup[2]
+
+    count = 0
+    changed = 0
+    while True:
+        pending = session.exec(
+            select(ItemChange)
+            .where(ItemChange.user_id == user_id)
+            .order_by(ItemChange.received_at)
+            .limit(settings.SYNC_BATCH_SIZE)
+        ).all()
+        if not pending:
+            break
+        item_ids = [change.item_id for change in pending]
+        read_until = max(change.received_at for change in pending)
+
+        written, updated = _sync_ids(client, session, user_id, item_ids)
+        # Items MeLi no longer returns (e.g. deleted) are dropped from the feed too
+        session.exec(delete(ItemChange).where(
+            ItemChange.user_id == user_id,
+            ItemChange.item_id.in_(item_ids),
+            ItemChange.received_at <= read_until,
+        ))
+        session.commit()
+        count, changed = count + written, changed + updated
+
+    logger.info(f"Synced {count} notified items for user_id={user_id} ({changed} changed)")
+    return count, changed
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from sqlmodel import Session, select
+from src.app.core.config import settings
+from src.app.core.db import session_scope
+from src.app.models.credential import MeliCredential
+from src.meli_auditor.auth import MeliAuth
+
+logger = logging.getLogger(__name__)
+
+# Process-wide token cache: credential id -> (access_token, refresh_token, expires_at)
+_token_cache: Dict[int, Tuple[str, str, float]] = {}
+_refresh_locks: Dict[int, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+def _refresh_lock_for(credential_id: int) -> threading.Lock:
+    with _registry_lock:
+        return _refresh_locks.setdefault(credential_id, threading.Lock())
+
+def invalidate_cached_token(credential_id: int) -> None:
+    """Drop the cached token, e.g. after the user logs in again."""
+    with _registry_lock:
+        _token_cache.pop(credential_id, None)
+
+class DBMeliAuth(MeliAuth):
+    """
+    Adapter to use Database for token storage instead of local file.
+
+    Tokens are shared through a process-wide cache, and refreshes are
+    single-flight across processes: the credential row is locked with
+    SELECT ... FOR UPDATE in a short dedicated transaction, re-read, and only
+    refreshed if no one else already did. The caller's session is never
+    committed from inside get_token.
+    """
+    def __init__(self, session: Session, credential: MeliCredential):
+        # Skip super().__init__ to avoid loading from file which might not exist or be wrong
+        self.credential_id = credential.id
+        self.access_token = credential.access_token
+        self.refresh_token = credential.refresh_token
+        self.expires_at = credential.expires_at
+        self._load_cached()
+        
+        self.db_session = session
+        self.credential = credential
+        self._refresh_lock = _refresh_lock_for(credential.id)
+        self._locked_credential: Optional[MeliCredential] = None
+
+    def _load_cached(self) -> None:
+        cached = _token_cache.get(self.credential_id)
+        if cached and cached[2] > self.expires_at:
+            self.access_token, self.refresh_token, self.expires_at = cached
+
+    def _store_cached(self) -> None:
+        with _registry_lock:
+            _token_cache[self.credential_id] = (self.access_token, self.refresh_token, self.expires_at)
+
+    def _is_fresh(self, margin: float) -> bool:
+        # Pick up tokens refreshed by other instances in this process first
+        self._load_cached()
+        return super()._is_fresh(margin)
+
+    @contextmanager
+    def _refresh_guard(self) -> Iterator[None]:
+        with session_scope() as session:
+            credential = session.exec(
+                select(MeliCredential).where(MeliCredential.id == self.credential_id).with_for_update()
+            ).one()
+            # Another process may have refreshed while we waited for the row lock
+            self.access_token = credential.access_token
+            self.refresh_token = credential.refresh_token
+            self.expires_at = credential.expires_at
+            self._store_cached()
+
+            self._locked_credential = credential
+            try:
+                yield
+            finally:
+                self._locked_credential = None
+            session.add(credential)
+            session.commit()  # Persists a refresh (if any) and releases the row lock
+
+    def _save_tokens(self) -> None:
+        """
+        Override to save tokens to the database (inside the locked transaction).
+        """
+        logger.info("Refreshing tokens in Database...")
+        self._store_cached()
+        credential = self._locked_credential
+        if credential is None:
+            logger.warning("Token saved outside of a refresh guard; only cached in memory.")
+            return
+        credential.access_token = self.access_token
+        credential.refresh_token = self.refresh_token
+        credential.expires_at = int(self.expires_at)
+        logger.info("Tokens updated in DB.")
+
+    def _load_tokens(self) -> None:
+        # Already loaded in __init__
+        pass
+
+class TokenRefresher(threading.Thread):
+    """
+    Background thread that refreshes every credential expiring within
+    TOKEN_REFRESH_AHEAD seconds, so request paths never wait on OAuth.
+    """
+    def __init__(self, interval: Optional[float] = None, ahead: Optional[float] = None):
+        super().__init__(name="token-refresher", daemon=True)
+        self.interval = interval or settings.TOKEN_REFRESH_INTERVAL
+        self.ahead = ahead or settings.TOKEN_REFRESH_AHEAD
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.refresh_expiring()
+            except Exception as e:
+                logger.error(f"Token refresher error: {e}")
+            self._stop_event.wait(self.interval)
+
+    def refresh_expiring(self) -> int:
+        refreshed = 0
+        with session_scope() as session:
+            credentials = session.exec(
+                select(MeliCredential).where(MeliCredential.expires_at < time.time() + self.ahead)
+            ).all()
+            for credential in credentials:
+                try:
+                    DBMeliAuth(session, credential).ensure_fresh(self.ahead)
+                    refreshed += 1
+                except Exception as e:
+                    # Likely revoked; the user has to log in again
+                    logger.error(f"Could not refresh token for user_id={credential.user_id}: {e}")
+        return refreshed
@@ -0,0 +1,82 @@
+import io
+import logging
+from typing import IO, Dict, List
+import pandas as pd
+from sqlmodel import Session, select
+from src.app.core.config import settings
+from src.app.models.sku_truth import SkuTruth
+from src.meli_auditor import tracing
+from src.meli_auditor.truth import TRUTH_COLUMNS, iter_truth_chunks
+
+logger = logging.getLogger(__name__)
+
+# SKUs per IN (...) list when loading truth for an audit batch
+LOOKUP_CHUNK_SIZE = 1000
+
+_STAGING_TABLE = """
+CREATE TEMP TABLE sku_truth_upload (
+    line bigint, sku text, weight_kg float8, width float8, height float8, depth float8
+) ON COMMIT DROP
+"""
+
+_MERGE_UPLOAD = """
+INSERT INTO sku_truth (user_id, sku, weight_kg, width, height, depth, updated_at)
+SELECT DISTINCT ON (sku) %(user_id)s, sku, weight_kg, width, height, depth, now()
+FROM sku_truth_upload
+ORDER BY sku, line
+ON CONFLICT (user_id, sku) DO UPDATE SET
+    weight_kg = EXCLUDED.weight_kg, width = EXCLUDED.width, height = EXCLUDED.height,
+    depth = EXCLUDED.depth, updated_at = EXCLUDED.updated_at
+"""
+
+_DELETE_MISSING = """
+DELETE FROM sku_truth t
+WHERE t.user_id = %(user_id)s
+  AND NOT EXISTS (SELECT 1 FROM sku_truth_upload u WHERE u.sku = t.sku)
+"""
+
+def copy_sku_truth(session: Session, user_id: int, source: IO[str], replace: bool = False) -> Dict[str, int]:
+    """
+    Bulk-load a truth CSV (sku,weight_kg,width,height,depth) for one seller.
+
+    Rows are validated in chunks and streamed with COPY into a temporary
+    table, then merged into sku_truth in one statement (first row wins for
+    duplicate SKUs). With `replace`, the seller's SKUs missing from the
+    upload are deleted. Everything commits or rolls back together.
+    """
+    # COPY needs the raw psycopg2 cursor of the session's connection
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(_STAGING_TABLE)
+        loaded = 0
+        for chunk in iter_truth_chunks(source, settings.SKU_TRUTH_COPY_CHUNK_SIZE):
+            if chunk.empty:
+                continue
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, columns=TRUTH_COLUMNS, header=False, index=True)
+            buffer.seek(0)
+            cursor.copy_expert("COPY sku_truth_upload FROM STDIN WITH (FORMAT csv)", buffer)
+            loaded += len(chunk)
+
+        cursor.execute(_MERGE_UPLOAD, {"user_id": user_id})
+        upserted = cursor.rowcount
+        deleted = 0
+        if replace:
+            cursor.execute(_DELETE_MISSING, {"user_id": user_id})
+            deleted = cursor.rowcount
+    finally:
+        cursor.close()
+    session.commit()
+    logger.info(f"SKU truth upload for user_id={user_id}: {loaded} rows, {upserted} upserted, {deleted} deleted")
+    return {"rows": loaded, "upserted": upserted, "deleted": deleted}
+
+def load_sku_truth_for(session: Session, user_id: int, skus: List[str]) -> pd.DataFrame:
+    """Truth rows for just these SKUs, as a frame with TRUTH_COLUMNS."""
+    rows = []
+    columns = [getattr(SkuTruth, c) for c in TRUTH_COLUMNS]
+    for i in range(0, len(skus), LOOKUP_CHUNK_SIZE):
+        chunk = skus[i:i + LOOKUP_CHUNK_SIZE]
+        statement = select(*columns).where(SkuTruth.user_id == user_id, SkuTruth.sku.in_(chunk))
+        with tracing.span("sku_truth_query", "db", skus=len(chunk)):
+            rows.extend(session.exec(statement).all())
+    return pd.DataFrame.from_records(rows, columns=TRUTH_COLUMNS)
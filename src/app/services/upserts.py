@@ -0,0 +1,42 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, SQLModel
+
+def bulk_upsert(
+    session: Session,
+    model: type[SQLModel],
+    rows: List[Dict[str, Any]],
+    keys: Sequence[str],
+    batch_size: int,
+    update_columns: Optional[Sequence[str]] = None,
+    where: Optional[Callable[[Any], Any]] = None,
+    commit: bool = False,
+) -> Tuple[int, int]:
+    """
+    INSERT ... ON CONFLICT (keys) DO UPDATE in batches of `batch_size`.
+    Conflicting rows get `update_columns` (default: every non-key column of
+    the rows), only where `where(excluded)` holds when given. With `commit`
+    each batch is committed on its own.
+    Returns (rows processed, rows inserted or updated).
+    """
+    count = 0
+    changed = 0
+    for i in range(0, len(rows), batch_size):
+        # Postgres rejects touching the same row twice in one statement
+        batch = list({tuple(row[k] for k in keys): row for row in rows[i:i + batch_size]}.values())
+
+        stmt = pg_insert(model).values(batch)
+        excluded = stmt.excluded
+        columns = update_columns if update_columns is not None else [c for c in batch[0] if c not in keys]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={col: excluded[col] for col in columns},
+            where=where(excluded) if where is not None else None,
+        )
+        result = session.execute(stmt)
+        if commit:
+            session.commit()
+
+        count += len(batch)
+        changed += result.rowcount
+    return count, changed
@@ -0,0 +1,110 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlmodel import SQLModel
+from src.app.core.config import settings
+from src.app.core.db import engine, session_scope
+import src.app.models # Import models to register them
+from src.app.services.jobs import claim_job, requeue_stale_jobs, run_job
+from src.app.services.tokens import TokenRefresher
+from src.meli_auditor import metrics, tracing
+from src.meli_auditor.rate_limit import share_app_quota
+
+logger = logging.getLogger(__name__)
+
+def _work_loop(worker_id: str, stop: threading.Event, poll_interval: float) -> None:
+    while not stop.is_set():
+        try:
+            with session_scope() as session:
+                job = claim_job(session, worker_id)
+                if job:
+                    run_job(session, job, worker_id)
+                    continue
+        except Exception as e:
+            logger.error(f"Worker {worker_id} error: {e}")
+        stop.wait(poll_interval)
+
+def _requeue_loop(stop: threading.Event) -> None:
+    # Every worker checks, so jobs of a dead worker are put back while others run
+    while True:
+        try:
+            with session_scope() as session:
+                requeued = requeue_stale_jobs(session)
+            if requeued:
+                logger.warning(f"Requeued {requeued} jobs whose worker stopped heartbeating")
+        except Exception as e:
+            logger.error(f"Stale job check failed: {e}")
+        if stop.wait(settings.JOB_STALE_AFTER / 2):
+            return
+
+def run_worker(concurrency: int, poll_interval: float, processes: int = 1) -> None:
+    """
+    Run `concurrency` threads, each claiming and executing one job at a time,
+    until SIGINT/SIGTERM. `processes` is the number of worker processes
+    sharing the app's rate limit quota.
+    """
+    stop = threading.Event()
+
+    def shutdown(signum, frame):
+        logger.info("Shutting down worker after current jobs...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    # A fresh process must not reuse pooled connections inherited from its parent
+    engine.dispose(close=False)
+    if processes > 1:
+        share_app_quota(processes)
+    # Opt-in via TRACE_PATH (use "{pid}" in it when running several processes)
+    tracing.configure()
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Worker {base_id} started with {concurrency} threads")
+    threading.Thread(target=_requeue_loop, args=(stop,), name="requeue-stale", daemon=True).start()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(concurrency):
+            executor.submit(_work_loop, f"{base_id}:{i}", stop, poll_interval)
+
+def start():
+    parser = argparse.ArgumentParser(description="MeLi Auditor job worker")
+    parser.add_argument("--processes", type=int, default=settings.WORKER_PROCESSES)
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY,
+                        help="Jobs run concurrently per process")
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL)
+    parser.add_argument("--metrics-port", type=int, default=settings.WORKER_METRICS_PORT,
+                        help="Serve Prometheus metrics on this port (single process only)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    SQLModel.metadata.create_all(engine)
+    # One refresher per worker host keeps tokens fresh ahead of the jobs
+    if settings.TOKEN_REFRESHER_ENABLED:
+        TokenRefresher().start()
+
+    if args.processes <= 1:
+        if args.metrics_port:
+            metrics.serve(args.metrics_port)
+        run_worker(args.concurrency, args.poll_interval)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(args.concurrency, args.poll_interval, args.processes))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+if __name__ == "__main__":
+    start()
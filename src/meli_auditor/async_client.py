@@ -0,0 +1,181 @@
+import asyncio
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception, before_sleep_log
+import logging
+from typing import Dict, Any, Optional, List, Union
+
+try:
+    import httpx
+except ImportError:  # optional, see AsyncMeliClient
+    httpx = None
+
+from . import metrics
+from .auth import MeliAuth
+from .client import BASE_URL, ITEMS_SCAN_PAGE_SIZE, MULTIGET_CHUNK_SIZE, parse_multiget
+from .config import settings
+from .rate_limit import RETRY_STATUS_CODES, RateLimiter, wait_retry_after
+
+logger = logging.getLogger(__name__)
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUS_CODES
+    return False
+
+class AsyncMeliClient:
+    """
+    asyncio counterpart of MeliClient for the read endpoints. Requires httpx
+    (poetry install -E async).
+    A single instance holds a bounded keep-alive pool, so many requests can be
+    in flight on one event loop without tying up a thread each. It shares the
+    process-wide rate limit buckets with MeliClient; there is no response cache.
+
+    Use as an async context manager (or call aclose()) to release the pool.
+    """
+    def __init__(
+        self,
+        auth: MeliAuth,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        timeout: float = 10.0,
+        seller_id: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        transport: Optional[Any] = None,
+    ):
+        if httpx is None:
+            raise ImportError("AsyncMeliClient requires httpx (poetry install -E async)")
+        self.auth = auth
+        # Same process-wide buckets as MeliClient, so sync and async callers share quota
+        self.rate_limiter = rate_limiter or RateLimiter(settings.APP_ID, seller_id)
+        self.http = httpx.AsyncClient(
+            base_url=BASE_URL,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(timeout),
+            transport=transport,
+        )
+        # Caps fan-out helpers so they queue here instead of on the pool.
+        self._semaphore = asyncio.Semaphore(max_connections)
+
+    async def __aenter__(self) -> "AsyncMeliClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def _get_headers(self) -> Dict[str, str]:
+        # A due refresh blocks on HTTP and file locks, so keep it off the event
+        # loop; MeliAuth lets only one thread refresh at a time.
+        token = await asyncio.to_thread(self.auth.get_token)
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+
+    @retry(
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(5),
+        wait=wait_retry_after(wait_random_exponential(multiplier=1, max=30)),
+        before_sleep=metrics.count_retries(before_sleep_log(logger, logging.WARNING)),
+        reraise=True
+    )
+    async def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Any:
+        headers = await self._get_headers()
+
+        try:
+            await self.rate_limiter.acquire_async()
+            template = metrics.endpoint_template(endpoint)
+            try:
+                with metrics.API_REQUEST_SECONDS.labels(method, template).time():
+                    response = await self.http.request(method, endpoint, headers=headers, params=params, json=data)
+            except httpx.TransportError:
+                metrics.API_RESPONSES.labels(method, template, "error").inc()
+                raise
+            metrics.API_RESPONSES.labels(method, template, str(response.status_code)).inc()
+
+            if response.status_code == 429:
+                # Retried by tenacity, honoring Retry-After when present
+                logger.warning("Rate limit hit (429).")
+
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP Error: {e}")
+            logger.error(f"Response body: {e.response.text}")
+
+            if e.response.status_code == 401:
+                logger.error("Unauthorized. Token logic should handle auto-refresh.")
+            raise
+
+    async def get_me(self) -> Dict[str, Any]:
+        return await self._request("GET", "/users/me")
+
+    async def get_orders(self, seller_id: int, limit: int = 50) -> Dict[str, Any]:
+        # Sort by date_desc to get latest
+        return await self._request("GET", "/orders/search", params={
+            "seller": seller_id,
+            "sort": "date_desc",
+            "limit": limit
+        })
+
+    async def get_shipment(self, shipment_id: int) -> Dict[str, Any]:
+        return await self._request("GET", f"/shipments/{shipment_id}")
+
+    async def get_shipments(self, shipment_ids: List[int]) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Fetch several shipments concurrently, each distinct id once.
+        Results keep the order of shipment_ids; failures are returned in place
+        as exceptions so one bad shipment doesn't cancel the rest.
+        """
+        async def fetch(shipment_id: int) -> Dict[str, Any]:
+            async with self._semaphore:
+                return await self.get_shipment(shipment_id)
+
+        unique = list(dict.fromkeys(shipment_ids))
+        results = await asyncio.gather(*(fetch(s) for s in unique), return_exceptions=True)
+        by_id = dict(zip(unique, results))
+        return [by_id[s] for s in shipment_ids]
+
+    async def get_items_ids(self, user_id: int) -> list[str]:
+        """
+        Fetch all item IDs for a user.
+        Follows the search_type=scan scroll_id, same as MeliClient.iter_items_ids.
+        """
+        items = []
+        params: Dict[str, Any] = {"search_type": "scan", "limit": ITEMS_SCAN_PAGE_SIZE}
+        while True:
+            response = await self._request("GET", f"/users/{user_id}/items/search", params=params)
+            results = response.get("results", [])
+            if not results:
+                break
+            items.extend(results)
+
+            scroll_id = response.get("scroll_id")
+            if not scroll_id:
+                break
+            params = {"search_type": "scan", "limit": ITEMS_SCAN_PAGE_SIZE, "scroll_id": scroll_id}
+
+        return items
+
+    async def get_items_details(self, ids: list[str], attributes: Optional[list[str]] = None) -> list[Dict[str, Any]]:
+        """
+        Fetch item details for a list of IDs.
+        Multiget chunks of 20 are requested concurrently; output keeps input order.
+        """
+        async def fetch(chunk: list[str]) -> list[Dict[str, Any]]:
+            params = {"ids": ",".join(chunk)}
+            if attributes:
+                params["attributes"] = ",".join(attributes)
+            async with self._semaphore:
+                response = await self._request("GET", "/items", params=params)
+            return parse_multiget(response)
+
+        chunks = [ids[i:i + MULTIGET_CHUNK_SIZE] for i in range(0, len(ids), MULTIGET_CHUNK_SIZE)]
+        results = await asyncio.gather(*(fetch(chunk) for chunk in chunks))
+        return [details for chunk_details in results for details in chunk_details]
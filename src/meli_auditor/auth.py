@@ -1,17 +1,52 @@
 import json
+import os
+import threading
 import time
 import requests
 import logging
-from typing import Optional, Dict, Any
+from contextlib import contextmanager
+from typing import Iterator, Optional, Dict, Any
 from .config import settings
 
 TOKEN_FILE = "tokens.json"
+TOKEN_LOCK_FILE = f"{TOKEN_FILE}.lock"
+REFRESH_MARGIN = 60  # Refresh this many seconds before expiry
 AUTH_URL = "https://auth.mercadolibre.com.co/authorization"
-TOKEN_URL = "https://api.mercadolibre.com/oauth/token"
+TOKEN_URL = f"{settings.API_BASE_URL.rstrip('/')}/oauth/token"
 
 logger = logging.getLogger(__name__)
 
+@contextmanager
+def _file_lock(path: str, timeout: float = 30.0, stale_after: float = 60.0) -> Iterator[None]:
+    """
+    Portable cross-process lock using an exclusively created lock file.
+    A lock file older than `stale_after` is assumed abandoned and removed.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > stale_after:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {path}")
+            time.sleep(0.1)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(path)
+
 class MeliAuth:
+    # Serializes refreshes between threads; every file-backed instance shares tokens.json
+    _refresh_lock = threading.Lock()
+
     def __init__(self):
         self.access_token: Optional[str] = None
         self.refresh_token: Optional[str] = None
@@ -38,11 +73,38 @@ class MeliAuth:
         if not self.access_token:
             raise Exception("No access token available. Please authenticate first.")
         
-        if time.time() > self.expires_at - 60:  # Refresh 60s before expiry
-            self._refresh_token()
+        self.ensure_fresh(REFRESH_MARGIN)
             
         return self.access_token
 
+    def _is_fresh(self, margin: float) -> bool:
+        return bool(self.access_token) and time.time() < self.expires_at - margin
+
+    def ensure_fresh(self, margin: float = REFRESH_MARGIN) -> None:
+        """
+        Refresh the token if it expires within `margin` seconds, single-flight:
+        one thread takes the process lock, then the cross-process guard, and
+        re-checks the stored tokens before calling the OAuth endpoint. Everyone
+        else waits and reuses its result, so concurrent workers never spend
+        (and invalidate) the same refresh token twice.
+        """
+        if self._is_fresh(margin):
+            return
+        with self._refresh_lock:
+            if self._is_fresh(margin):
+                return
+            with self._refresh_guard():
+                if self._is_fresh(margin):
+                    return
+                self._refresh_token()
+
+    @contextmanager
+    def _refresh_guard(self) -> Iterator[None]:
+        # Another process may have refreshed already: reload under the lock
+        with _file_lock(TOKEN_LOCK_FILE):
+            self._load_tokens()
+            yield
+
     def _refresh_token(self) -> None:
         if not self.refresh_token:
             raise Exception("No refresh token available.")
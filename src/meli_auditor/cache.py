@@ -0,0 +1,133 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from .config import settings
+
+# Shipments in these states no longer change, so their bodies can be kept long-term
+FINAL_SHIPMENT_STATUSES = {"delivered", "cancelled", "not_delivered"}
+# The disk tier is pruned on open and after this many writes
+PRUNE_EVERY = 1000
+
+class CacheEntry(NamedTuple):
+    body: Any
+    etag: Optional[str]
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+def shipment_ttl(body: Dict[str, Any]) -> float:
+    if body.get("status") in FINAL_SHIPMENT_STATUSES:
+        return settings.CACHE_FINAL_TTL
+    return settings.CACHE_ACTIVE_TTL
+
+def item_ttl(body: Dict[str, Any]) -> float:
+    return settings.CACHE_ITEM_TTL
+
+class ResponseCache:
+    """
+    Two-tier cache for API response bodies: an in-memory LRU in front of an
+    optional SQLite file, so repeated audits (even across runs) skip requests.
+    Both tiers are bounded LRUs (max_entries in memory, max_disk_entries on disk).
+
+    Expired entries are still returned by get() so callers can revalidate
+    them with their ETag; check CacheEntry.is_fresh before using the body.
+
+    Item bodies are kept for CACHE_ITEM_TTL, so don't give a cached client to
+    the item sync: it would miss changes made within that time.
+    """
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None, max_disk_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.CACHE_MAX_ENTRIES
+        self.max_disk_entries = max_disk_entries or settings.CACHE_MAX_DISK_ENTRIES
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL DEFAULT 0)"
+            )
+            try:
+                # Files written before the disk tier was an LRU
+                self._db.execute("ALTER TABLE response_cache ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_accessed_at ON response_cache (accessed_at)")
+            self._db.commit()
+            self.prune()
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT body, etag, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            entry = CacheEntry(json.loads(row[0]), row[1], row[2])
+            self._remember(key, entry)
+            return entry
+
+    def set(self, key: str, body: Any, ttl: float, etag: Optional[str] = None) -> None:
+        entry = CacheEntry(body, etag, time.time() + ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, body, etag, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(body), etag, entry.expires_at, time.time()),
+                )
+                self._db.commit()
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune_disk()
+
+    def prune(self) -> None:
+        """
+        Drop expired entries that have no ETag to revalidate with, then the
+        least recently used disk entries beyond max_disk_entries.
+        """
+        now = time.time()
+        with self._lock:
+            for key in [k for k, e in self._memory.items() if e.expires_at <= now and not e.etag]:
+                del self._memory[key]
+            if self._db is not None:
+                self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        # Caller holds the lock
+        self._db.execute("DELETE FROM response_cache WHERE expires_at <= ? AND etag IS NULL", (time.time(),))
+        excess = self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM response_cache WHERE key IN "
+                "(SELECT key FROM response_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+        self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,19 +1,85 @@
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
+from requests.adapters import HTTPAdapter
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception, before_sleep_log
 import logging
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional
 
+from . import metrics, tracing
 from .auth import MeliAuth
+from .cache import ResponseCache, item_ttl, shipment_ttl
+from .config import settings
+from .rate_limit import RETRY_STATUS_CODES, RateLimiter, wait_retry_after
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://api.mercadolibre.com"
+BASE_URL = settings.API_BASE_URL.rstrip("/")
+MULTIGET_CHUNK_SIZE = 20  # MeLi limit for /items?ids=
+ORDERS_PAGE_SIZE = 50  # MeLi max limit for /orders/search
+ORDERS_MAX_OFFSET = 10000  # /orders/search rejects offsets beyond this
+ITEMS_SCAN_PAGE_SIZE = 100  # max limit for search_type=scan
+ITEMS_SEARCH_MAX_OFFSET = 1000  # offset paging of /users/{id}/items/search stops here
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def parse_multiget(response: Any) -> list[Dict[str, Any]]:
+    """
+    Extract item bodies from a multiget response.
+    The structure is list of objects with 'code' and 'body'.
+    Example response: [{ "code": 200, "body": { ... } }, { "code": 404, "body": ... }]
+    """
+    details = []
+    # Should be a list usually for multiget
+    if not isinstance(response, list):
+        return details
+    for item_resp in response:
+        if item_resp.get("code") == 200:
+            details.append(item_resp.get("body"))
+        else:
+            logger.warning(f"Failed to fetch item details: {item_resp}")
+    return details
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive datetimes are taken as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def _format_date(value: datetime) -> str:
+    # MeLi expects e.g. 2024-01-31T00:00:00.000-00:00
+    return _as_utc(value).isoformat(timespec="milliseconds")
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code in RETRY_STATUS_CODES
+    return False
 
 class MeliClient:
-    def __init__(self, auth: MeliAuth):
+    def __init__(
+        self,
+        auth: MeliAuth,
+        pool_maxsize: int = 10,
+        seller_id: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
         self.auth = auth
+        # Opt-in cache for shipment and item bodies (see cache.py for TTLs)
+        self.cache = cache
+        # Shared per APP_ID (and per seller when known) across all clients in the process
+        self.rate_limiter = rate_limiter or RateLimiter(settings.APP_ID, seller_id)
         self.session = requests.Session()
+        # Size the keep-alive pool for concurrent callers (e.g. the auditor's
+        # shipment workers), otherwise extra connections are opened and dropped.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def _get_headers(self) -> Dict[str, str]:
         return {
@@ -22,26 +88,45 @@ class MeliClient:
         }
 
     @retry(
-        retry=retry_if_exception_type((requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING)
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(5),
+        wait=wait_retry_after(wait_random_exponential(multiplier=1, max=30)),
+        before_sleep=metrics.count_retries(before_sleep_log(logger, logging.WARNING)),
+        reraise=True
     )
-    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Any:
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
         url = f"{BASE_URL}{endpoint}"
         headers = self._get_headers()
+        if extra_headers:
+            headers.update(extra_headers)
         
         try:
-            response = self.session.request(method, url, headers=headers, params=params, json=data)
-            
+            # Throttle before sending; retried attempts pass through here again
+            self.rate_limiter.acquire()
+            template = metrics.endpoint_template(endpoint)
+            try:
+                with metrics.API_REQUEST_SECONDS.labels(method, template).time(), \
+                        tracing.span(template, "http", method=method) as span:
+                    response = self.session.request(method, url, headers=headers, params=params, json=data)
+                    span.set(status=response.status_code)
+            except requests.RequestException:
+                metrics.API_RESPONSES.labels(method, template, "error").inc()
+                raise
+            metrics.API_RESPONSES.labels(method, template, str(response.status_code)).inc()
+
             if response.status_code == 429:
-                # Handle rate limit specifically if needed, though tenacity can handle status codes if configured
-                # For this PoC, we let it fail or could implement specific wait
-                logger.warning("Rate limit hit. Retrying should be handled by caller or extended retry logic.")
-                response.raise_for_status()
+                # Retried by tenacity, honoring Retry-After when present
+                logger.warning("Rate limit hit (429).")
 
             response.raise_for_status()
-            return response.json()
+            return response
         except requests.HTTPError as e:
             logger.error(f"HTTP Error: {e}")
             if e.response is not None:
@@ -52,6 +137,36 @@ class MeliClient:
                 logger.error("Unauthorized. Token logic should handle auto-refresh.")
             raise
 
+    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None, data: Optional[Dict] = None) -> Any:
+        return self._send(method, endpoint, params=params, data=data).json()
+
+    def _get_cached(self, endpoint: str, ttl: Callable[[Any], float]) -> Any:
+        """
+        GET through the response cache. Fresh entries skip the network; stale
+        ones are revalidated with If-None-Match when an ETag was stored.
+        """
+        if self.cache is None:
+            return self._request("GET", endpoint)
+
+        entry = self.cache.get(endpoint)
+        if entry is not None and entry.is_fresh:
+            metrics.CACHE_REQUESTS.labels("hit").inc()
+            return entry.body
+
+        conditional = {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+        response = self._send("GET", endpoint, extra_headers=conditional)
+        etag = response.headers.get("ETag")
+        if response.status_code == 304 and entry is not None:
+            metrics.CACHE_REQUESTS.labels("revalidated").inc()
+            body = entry.body
+            # A 304 may omit the ETag; the stored one is still valid
+            etag = etag or entry.etag
+        else:
+            metrics.CACHE_REQUESTS.labels("miss").inc()
+            body = response.json()
+        self.cache.set(endpoint, body, ttl(body), etag=etag)
+        return body
+
     def get_me(self) -> Dict[str, Any]:
         return self._request("GET", "/users/me")
 
@@ -63,69 +178,174 @@ class MeliClient:
             "limit": limit
         })
 
+    def _search_orders(self, seller_id: int, date_from: datetime, date_to: datetime, offset: int) -> Dict[str, Any]:
+        return self._request("GET", "/orders/search", params={
+            "seller": seller_id,
+            "order.date_created.from": _format_date(date_from),
+            "order.date_created.to": _format_date(date_to),
+            "sort": "date_asc",
+            "offset": offset,
+            "limit": ORDERS_PAGE_SIZE
+        })
+
+    def iter_orders(
+        self,
+        seller_id: int,
+        date_from: datetime,
+        date_to: datetime,
+        window: timedelta = timedelta(days=7),
+        min_window: timedelta = timedelta(hours=1),
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every order created in [date_from, date_to), oldest first.
+        The range is walked in date windows so no single search needs an offset
+        past ORDERS_MAX_OFFSET; a window whose total exceeds the cap is split
+        in half (down to min_window). Orders are yielded page by page.
+        """
+        date_from, date_to = _as_utc(date_from), _as_utc(date_to)
+        windows = []
+        start = date_from
+        while start < date_to:
+            end = min(start + window, date_to)
+            windows.append((start, end))
+            start = end
+        windows.reverse()  # used as a stack, oldest window on top
+
+        while windows:
+            start, end = windows.pop()
+            # The API's "to" bound is inclusive; stop just short of the next window
+            page = self._search_orders(seller_id, start, end - timedelta(milliseconds=1), 0)
+            total = page.get("paging", {}).get("total", 0)
+
+            if total > ORDERS_MAX_OFFSET + ORDERS_PAGE_SIZE and end - start > min_window:
+                middle = start + (end - start) / 2
+                windows.append((middle, end))
+                windows.append((start, middle))
+                continue
+            if total > ORDERS_MAX_OFFSET + ORDERS_PAGE_SIZE:
+                logger.warning(f"{total} orders between {start} and {end}; only the first {ORDERS_MAX_OFFSET + ORDERS_PAGE_SIZE} are reachable.")
+
+            offset = 0
+            while True:
+                results = page.get("results", [])
+                yield from results
+
+                offset += ORDERS_PAGE_SIZE
+                if not results or offset >= total or offset > ORDERS_MAX_OFFSET:
+                    break
+                page = self._search_orders(seller_id, start, end - timedelta(milliseconds=1), offset)
+
     def get_shipment(self, shipment_id: int) -> Dict[str, Any]:
-        return self._request("GET", f"/shipments/{shipment_id}")
+        return self._get_cached(f"/shipments/{shipment_id}", shipment_ttl)
 
-    def get_items_ids(self, user_id: int) -> list[str]:
+    def iter_items_ids(self, user_id: int) -> Iterator[list[str]]:
         """
-        Fetch all item IDs for a user.
-        Uses the search endpoint to retrieve IDs.
+        Yield the user's item IDs one page at a time.
+        Uses search_type=scan and follows scroll_id, which (unlike offset
+        paging) is not capped, so very large catalogs are enumerated fully.
+        The scroll_id expires a few minutes after each call, so consume promptly.
         """
-        # Initially, we only get 'results' which is a list of IDs.
-        # Pagination might be needed if user has many items, but for now we implement basic search.
-        # MeLi default limit is 50. We should scroll if more are needed.
-        # For this ticket's scope, we'll implement simple scrolling.
-        items = []
-        offset = 0
-        limit = 50
+        params: Dict[str, Any] = {"search_type": "scan", "limit": ITEMS_SCAN_PAGE_SIZE}
         while True:
+            response = self._request("GET", f"/users/{user_id}/items/search", params=params)
+            results = response.get("results", [])
+            if not results:
+                break
+            yield results
+
+            scroll_id = response.get("scroll_id")
+            if not scroll_id:
+                break
+            params = {"search_type": "scan", "limit": ITEMS_SCAN_PAGE_SIZE, "scroll_id": scroll_id}
+
+    def iter_recently_updated_ids(self, user_id: int) -> Iterator[list[str]]:
+        """
+        Yield the user's item IDs one page at a time, most recently updated
+        first. Offset paging, so it ends after ITEMS_SEARCH_MAX_OFFSET items;
+        stop consuming once the items are older than you need.
+        """
+        offset = 0
+        while offset <= ITEMS_SEARCH_MAX_OFFSET:
             response = self._request("GET", f"/users/{user_id}/items/search", params={
-                "search_type": "scan",
-                "limit": limit,
-                "offset": offset
+                "orders": "last_updated_desc",
+                "offset": offset,
+                "limit": ITEMS_SCAN_PAGE_SIZE,
             })
             results = response.get("results", [])
-            items.extend(results)
-            
-            # Helper paging: if results < limit, we are done
-            # Note: /users/{id}/items/search with search_type=scan is recommended for getting all items.
-            # It uses scroll_id usually, but simple offset/limit works for standard search. 
-            # For 'scan' type, MeLi returns scroll_id. Let's stick to standard search for simplicity unless 'scan' is strictly required.
-            # Actually, the requirement says "GET /users/{id}/items/search".
-            # Let's assume standard paging for now.
-            paging = response.get("paging", {})
-            total = paging.get("total", 0)
-            
-            if len(items) >= total or len(results) == 0:
+            if not results:
                 break
-            
-            offset += limit
-            
-        return items
+            yield results
 
-    def get_items_details(self, ids: list[str]) -> list[Dict[str, Any]]:
+            offset += len(results)
+            if offset >= response.get("paging", {}).get("total", 0):
+                break
+
+    def get_items_ids(self, user_id: int) -> list[str]:
         """
-        Fetch item details for a list of IDs.
+        Fetch all item IDs for a user.
+        """
+        return [item_id for page in self.iter_items_ids(user_id) for item_id in page]
+
+    def _multiget(self, chunk: list[str], attributes: Optional[list[str]] = None) -> list[Dict[str, Any]]:
+        # Partial (attributes) reads are used for change detection and are never cached
+        use_cache = self.cache is not None and not attributes
+        cached: Dict[str, Dict[str, Any]] = {}
+        if use_cache:
+            for item_id in chunk:
+                entry = self.cache.get(f"/items/{item_id}")
+                if entry is not None and entry.is_fresh:
+                    cached[item_id] = entry.body
+            missing = [item_id for item_id in chunk if item_id not in cached]
+        else:
+            missing = chunk
+
+        fetched: list[Dict[str, Any]] = []
+        if missing:
+            params = {"ids": ",".join(missing)}
+            if attributes:
+                params["attributes"] = ",".join(attributes)
+            response = self._request("GET", f"/items", params=params)
+            fetched = parse_multiget(response)
+        if not use_cache:
+            return fetched
+
+        for body in fetched:
+            self.cache.set(f"/items/{body.get('id')}", body, item_ttl(body))
+            cached[body.get("id")] = body
+        # Keep input order, as without the cache
+        return [cached[item_id] for item_id in chunk if item_id in cached]
+
+    def iter_items_details(
+        self,
+        ids: Iterable[str],
+        attributes: Optional[list[str]] = None,
+        max_workers: int = 1,
+    ) -> Iterator[list[Dict[str, Any]]]:
+        """
+        Yield item details per multiget chunk of 20 (MeLi limit), in input order.
+        `ids` may be any iterable (e.g. a flattened iter_items_ids); with
+        max_workers > 1 up to that many chunks are requested in parallel,
+        reading ahead at most a couple of chunks per worker.
+        `attributes` restricts the returned fields (e.g. ["id", "last_updated"]).
+        """
+        chunks = batched(ids, MULTIGET_CHUNK_SIZE)
+        if max_workers <= 1:
+            for chunk in chunks:
+                yield self._multiget(chunk, attributes)
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for window in batched(chunks, max_workers * 2):
+                yield from executor.map(lambda chunk: self._multiget(chunk, attributes), window)
+
+    def get_items_details(
+        self,
+        ids: Iterable[str],
+        attributes: Optional[list[str]] = None,
+        max_workers: int = 1,
+    ) -> list[Dict[str, Any]]:
+        """
+        Fetch item details for the given IDs.
         Chunks requests in groups of 20 (MeLi limit for multiget).
         """
-        chunk_size = 20
-        all_details = []
-        
-        for i in range(0, len(ids), chunk_size):
-            chunk = ids[i:i + chunk_size]
-            ids_str = ",".join(chunk)
-            response = self._request("GET", f"/items", params={"ids": ids_str})
-            # Multi-get returns a list of results inside the response list (or sometimes dict with body).
-            # The structure is list of objects with 'code' and 'body'.
-            # Example response: [{ "code": 200, "body": { ... } }, { "code": 404, "body": ... }]
-            if isinstance(response, list):
-                for item_resp in response:
-                    if item_resp.get("code") == 200:
-                        all_details.append(item_resp.get("body"))
-                    else:
-                        logger.warning(f"Failed to fetch item details: {item_resp}")
-            else:
-                 # Should be a list usually for multiget
-                 pass
-
-        return all_details
+        return [details for chunk in self.iter_items_details(ids, attributes, max_workers) for details in chunk]
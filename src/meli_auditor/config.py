@@ -1,9 +1,40 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     APP_ID: str
     CLIENT_SECRET: str
     REDIRECT_URI: str = "http://localhost:3000"
+    # Point at a local stand-in (e.g. benchmarks/fake_meli.py) for offline runs
+    API_BASE_URL: str = "https://api.mercadolibre.com"
+
+    # Number of concurrent /shipments requests during an audit (1 = serial)
+    AUDIT_MAX_WORKERS: int = 8
+    # cm3 per kg used to turn package volume into volumetric weight
+    VOLUMETRIC_DIVISOR: float = 5000.0
+    # Shipping tariff table (CSV or JSON) used to estimate money lost
+    RATE_CARD_PATH: Optional[str] = None
+
+    # Client-side request throttling (requests/second and burst size); 0 disables
+    RATE_LIMIT_APP_PER_SECOND: float = 10.0
+    RATE_LIMIT_APP_BURST: int = 20
+    RATE_LIMIT_SELLER_PER_SECOND: float = 5.0
+    RATE_LIMIT_SELLER_BURST: int = 10
+
+    # Opt-in response cache for shipments/items (in-memory LRU, plus SQLite at CACHE_PATH)
+    CACHE_ENABLED: bool = False
+    CACHE_PATH: Optional[str] = "meli_cache.sqlite"
+    CACHE_MAX_ENTRIES: int = 50000
+    CACHE_MAX_DISK_ENTRIES: int = 500000
+    CACHE_FINAL_TTL: float = 30 * 24 * 3600  # delivered / cancelled shipments
+    CACHE_ACTIVE_TTL: float = 600  # shipments still moving
+    CACHE_ITEM_TTL: float = 3600
+
+    # Prometheus metrics (needs prometheus_client); served at /metrics by the API
+    METRICS_ENABLED: bool = True
+    # Chrome trace output (e.g. trace-{pid}.json); unset disables tracing
+    TRACE_PATH: Optional[str] = None
+    TRACE_MAX_EVENTS: int = 1_000_000
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8', extra="ignore")
 
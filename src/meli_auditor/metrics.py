@@ -0,0 +1,121 @@
+import re
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Iterator, Optional, Tuple
+
+from . import tracing
+from .config import settings
+
+try:
+    import prometheus_client
+except ImportError:  # Optional: without it every metric is a no-op
+    prometheus_client = None
+
+# Seconds; MeLi calls are usually 50ms-1s, retried ones can take much longer
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 120.0)
+
+_enabled = settings.METRICS_ENABLED and prometheus_client is not None
+
+def enabled() -> bool:
+    return _enabled
+
+def disable() -> None:
+    """Turn every metric into a no-op (e.g. for one-off CLI runs)."""
+    global _enabled
+    _enabled = False
+
+class _NoopChild:
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def time(self) -> ContextManager[Any]:
+        return nullcontext()
+
+_NOOP = _NoopChild()
+
+class _Metric:
+    """prometheus_client metric that degrades to a no-op when metrics are off."""
+    def __init__(self, kind: str, name: str, documentation: str, labelnames: Tuple[str, ...], **kwargs: Any):
+        self._metric = None
+        self._labelled = bool(labelnames)
+        if prometheus_client is not None:
+            self._metric = getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+    def labels(self, *values: Any) -> Any:
+        if not _enabled:
+            return _NOOP
+        return self._metric.labels(*values) if self._labelled else self._metric
+
+API_REQUEST_SECONDS = _Metric(
+    "Histogram", "meli_api_request_seconds", "MercadoLibre API request latency per attempt",
+    ("method", "endpoint"), buckets=LATENCY_BUCKETS,
+)
+API_RESPONSES = _Metric(
+    "Counter", "meli_api_responses_total", "MercadoLibre API responses by status code ('error' for transport errors)",
+    ("method", "endpoint", "status"),
+)
+API_RETRIES = _Metric(
+    "Counter", "meli_api_retries_total", "MercadoLibre API requests retried, by reason",
+    ("endpoint", "reason"),
+)
+RATE_LIMIT_WAIT_SECONDS = _Metric(
+    "Counter", "meli_rate_limit_wait_seconds_total", "Time spent waiting on client-side rate limit buckets",
+    (),
+)
+CACHE_REQUESTS = _Metric(
+    "Counter", "meli_cache_requests_total", "Response cache lookups by result (hit, revalidated, miss)",
+    ("result",),
+)
+STAGE_SECONDS = _Metric(
+    "Histogram", "meli_pipeline_stage_seconds", "Time per unit of work in each sync/audit pipeline stage",
+    ("pipeline", "stage"), buckets=STAGE_BUCKETS,
+)
+PIPELINE_ITEMS = _Metric(
+    "Counter", "meli_pipeline_items_total", "Items/lines handled by the sync and audit pipelines",
+    ("pipeline", "result"),
+)
+
+_ID_SEGMENT = re.compile(r"^(\d+|[A-Z]{3}\d+)$")
+
+def endpoint_template(endpoint: str) -> str:
+    """/shipments/4000123 -> /shipments/{id}, so label cardinality stays bounded."""
+    path = endpoint.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+@contextmanager
+def stage(pipeline: str, name: str) -> Iterator[None]:
+    """Time a block as one observation of a pipeline stage (and a trace span when tracing)."""
+    with STAGE_SECONDS.labels(pipeline, name).time(), tracing.span(name, pipeline):
+        yield
+
+def count(pipeline: str, result: str, amount: float = 1) -> None:
+    if amount:
+        PIPELINE_ITEMS.labels(pipeline, result).inc(amount)
+
+def retry_reason(exc: Optional[BaseException]) -> str:
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None:
+        return str(status)
+    return exc.__class__.__name__ if exc is not None else "unknown"
+
+def count_retries(before_sleep: Callable[[Any], None]) -> Callable[[Any], None]:
+    """Wrap a tenacity before_sleep hook of a (self, method, endpoint, ...) request method to count retries."""
+    def hook(retry_state: Any) -> None:
+        before_sleep(retry_state)
+        args = retry_state.args
+        endpoint = args[2] if len(args) > 2 else retry_state.kwargs.get("endpoint", "unknown")
+        API_RETRIES.labels(endpoint_template(endpoint), retry_reason(retry_state.outcome.exception())).inc()
+    return hook
+
+def render() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format, with its content type."""
+    return prometheus_client.generate_latest(), prometheus_client.CONTENT_TYPE_LATEST
+
+def serve(port: int) -> None:
+    """Expose /metrics on its own port (for processes without the API, e.g. workers)."""
+    if _enabled:
+        prometheus_client.start_http_server(port)
@@ -0,0 +1,101 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+DEFAULT_ZONE = "default"
+
+class RateCard:
+    """
+    Local MercadoLibre shipping tariff table.
+
+    Each zone has weight brackets: a package costs the price of the first
+    bracket whose `max_weight_kg` is >= its billable weight. Billable weight
+    is the larger of the real weight and volume / `volumetric_divisor`.
+    Destinations (shipment receiver state ids) map to zones through
+    `zone_map`; anything unmapped is quoted in `default_zone`.
+
+    Quoting is done locally and vectorized, so auditing a report costs no
+    extra API calls.
+    """
+    def __init__(
+        self,
+        brackets: pd.DataFrame,
+        volumetric_divisor: Optional[float] = None,
+        zone_map: Optional[Dict[str, str]] = None,
+        default_zone: str = DEFAULT_ZONE,
+    ):
+        missing = {"max_weight_kg", "cost"} - set(brackets.columns)
+        if missing:
+            raise ValueError(f"Rate card is missing columns: {', '.join(sorted(missing))}")
+        if "zone" not in brackets.columns:
+            brackets = brackets.assign(zone=default_zone)
+
+        self.volumetric_divisor = volumetric_divisor or settings.VOLUMETRIC_DIVISOR
+        self.zone_map = {str(k): str(v) for k, v in (zone_map or {}).items()}
+        self.default_zone = default_zone
+
+        # Sorted bracket limits per zone, ready for np.searchsorted
+        self._tables: Dict[str, tuple] = {}
+        for zone, table in brackets.astype({"zone": str}).groupby("zone"):
+            table = table.sort_values("max_weight_kg")
+            self._tables[zone] = (
+                table["max_weight_kg"].to_numpy(dtype=float),
+                table["cost"].to_numpy(dtype=float),
+            )
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs: Any) -> "RateCard":
+        """CSV with columns zone (optional), max_weight_kg, cost."""
+        return cls(pd.read_csv(path), **kwargs)
+
+    @classmethod
+    def from_json(cls, path: str) -> "RateCard":
+        """
+        JSON like:
+        {"volumetric_divisor": 5000, "default_zone": "national",
+         "zone_map": {"AR-C": "local"},
+         "brackets": [{"zone": "local", "max_weight_kg": 0.5, "cost": 3100}, ...]}
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            pd.DataFrame(data["brackets"]),
+            volumetric_divisor=data.get("volumetric_divisor"),
+            zone_map=data.get("zone_map"),
+            default_zone=data.get("default_zone", DEFAULT_ZONE),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RateCard":
+        if Path(path).suffix.lower() == ".json":
+            return cls.from_json(path)
+        return cls.from_csv(path)
+
+    def zones_for(self, destinations: pd.Series) -> pd.Series:
+        return destinations.astype(object).map(self.zone_map).fillna(self.default_zone).astype(str)
+
+    def billable_weight(self, weight_kg: pd.Series, volume_cm3: pd.Series) -> pd.Series:
+        return np.maximum(weight_kg, volume_cm3 / self.volumetric_divisor)
+
+    def quote(self, billable_weight: pd.Series, zones: pd.Series) -> pd.Series:
+        """
+        Expected cost for each billable weight in its zone.
+        NaN when the zone is unknown or the weight is above the last bracket.
+        """
+        weights = billable_weight.to_numpy(dtype=float)
+        zones = zones.to_numpy()
+        costs = np.full(len(weights), np.nan)
+        for zone, (limits, prices) in self._tables.items():
+            mask = zones == zone
+            if not mask.any():
+                continue
+            idx = np.searchsorted(limits, weights[mask], side="left")
+            in_range = idx < len(limits)
+            zone_costs = np.full(idx.shape, np.nan)
+            zone_costs[in_range] = prices[idx[in_range]]
+            costs[mask] = zone_costs
+        return pd.Series(costs, index=billable_weight.index)
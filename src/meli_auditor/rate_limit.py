@@ -0,0 +1,149 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from tenacity import RetryCallState
+from tenacity.wait import wait_base
+
+from . import metrics
+from .config import settings
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60.0  # Never sleep longer than this on a single Retry-After
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    `rate` tokens are added per second up to `capacity`. reserve() takes a
+    token immediately (the balance may go negative) and returns how long the
+    caller must wait before sending, so waiters are served in arrival order.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# Buckets are process-wide so every client for the same app/seller shares quota.
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+def get_bucket(key: str, rate: float, capacity: float) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _buckets[key] = bucket
+        return bucket
+
+def share_app_quota(processes: int) -> None:
+    """
+    Buckets are per process: call in each of `processes` worker processes so
+    together they stay within the app-wide quota. Per-seller quotas are not split.
+    """
+    settings.RATE_LIMIT_APP_PER_SECOND = settings.RATE_LIMIT_APP_PER_SECOND / processes
+    settings.RATE_LIMIT_APP_BURST = max(1, settings.RATE_LIMIT_APP_BURST // processes)
+
+class RateLimiter:
+    """
+    Client-side throttle combining the app-wide quota (per APP_ID) with an
+    optional per-seller quota. A rate of 0 disables that level.
+    """
+    def __init__(
+        self,
+        app_id: str,
+        seller_id: Optional[int] = None,
+        app_rate: Optional[float] = None,
+        app_burst: Optional[float] = None,
+        seller_rate: Optional[float] = None,
+        seller_burst: Optional[float] = None,
+    ):
+        app_rate = settings.RATE_LIMIT_APP_PER_SECOND if app_rate is None else app_rate
+        app_burst = settings.RATE_LIMIT_APP_BURST if app_burst is None else app_burst
+        seller_rate = settings.RATE_LIMIT_SELLER_PER_SECOND if seller_rate is None else seller_rate
+        seller_burst = settings.RATE_LIMIT_SELLER_BURST if seller_burst is None else seller_burst
+
+        self.buckets = []
+        if app_rate > 0:
+            self.buckets.append(get_bucket(f"app:{app_id}", app_rate, app_burst))
+        if seller_id is not None and seller_rate > 0:
+            self.buckets.append(get_bucket(f"seller:{app_id}:{seller_id}", seller_rate, seller_burst))
+
+    def _reserve(self) -> float:
+        return max((bucket.reserve() for bucket in self.buckets), default=0.0)
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            metrics.RATE_LIMIT_WAIT_SECONDS.labels().inc(delay)
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            metrics.RATE_LIMIT_WAIT_SECONDS.labels().inc(delay)
+            await asyncio.sleep(delay)
+
+def retry_after_seconds(response: Any) -> Optional[float]:
+    """
+    Parse the Retry-After header (delta-seconds or HTTP-date) of a
+    requests/httpx response. Returns None when absent or unparseable.
+    """
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class wait_retry_after(wait_base):
+    """
+    tenacity wait strategy: honor Retry-After from the failed response
+    (plus a little jitter so concurrent workers don't retry in lockstep),
+    otherwise fall back to the given strategy.
+    """
+    def __init__(self, fallback: wait_base, max_wait: float = MAX_RETRY_AFTER):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = retry_after_seconds(getattr(exc, "response", None))
+        if delay is None:
+            return self.fallback(retry_state)
+        return min(delay, self.max_wait) + random.uniform(0, 1)
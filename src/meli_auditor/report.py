@@ -0,0 +1,139 @@
+import gzip
+from typing import Any, Optional
+
+import pandas as pd
+
+from . import tracing
+
+XLSX_MAX_ROWS = 1_048_576  # Excel's row limit per sheet, header included
+
+def _plain_rows(frame: pd.DataFrame):
+    # Python scalars and None instead of numpy values/NaN, for row-based writers
+    return frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+
+class ReportWriter:
+    """
+    Incremental report writer: call write() once per audit batch and close()
+    at the end (or use it as a context manager). Only one batch is held in
+    memory at a time.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_written = 0
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        with tracing.span("report_write", "report", rows=len(frame), writer=type(self).__name__):
+            self._write(frame)
+        self.rows_written += len(frame)
+
+    def _write(self, frame: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        with tracing.span("report_close", "report", writer=type(self).__name__):
+            self.close()
+
+class CsvReportWriter(ReportWriter):
+    """CSV, gzip-compressed when the path ends in .gz."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        if path.endswith(".gz"):
+            self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            self._file = open(path, "w", encoding="utf-8", newline="")
+        self._columns: Optional[list] = None
+
+    def _write(self, frame: pd.DataFrame) -> None:
+        header = self._columns is None
+        if header:
+            self._columns = list(frame.columns)
+        frame.to_csv(self._file, columns=self._columns, header=header, index=False)
+
+    def close(self) -> None:
+        self._file.close()
+
+class ParquetReportWriter(ReportWriter):
+    """Parquet, one row group per batch. Requires pyarrow."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet reports require pyarrow (poetry install -E parquet)") from e
+        self._pa = pa
+        self._pq = pq
+        self._writer = None
+
+    def _write(self, frame: pd.DataFrame) -> None:
+        if self._writer is None:
+            table = self._pa.Table.from_pandas(frame, preserve_index=False)
+            # A column with only missing values has no type yet; assume text
+            schema = self._pa.schema([
+                field.with_type(self._pa.string()) if self._pa.types.is_null(field.type) else field
+                for field in table.schema
+            ], metadata=table.schema.metadata)
+            table = table.cast(schema)
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        else:
+            # Later batches are cast to the first batch's schema
+            table = self._pa.Table.from_pandas(frame, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+class XlsxReportWriter(ReportWriter):
+    """
+    XLSX through openpyxl's write-only mode, which streams rows to disk.
+    Continues on a new sheet when Excel's row limit is reached.
+    """
+    def __init__(self, path: str):
+        super().__init__(path)
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._columns: Optional[list] = None
+
+    def _new_sheet(self) -> None:
+        self._sheet = self._workbook.create_sheet(f"report_{len(self._workbook.worksheets) + 1}")
+        self._sheet.append(self._columns)
+        self._sheet_rows = 1
+
+    def _write(self, frame: pd.DataFrame) -> None:
+        if self._columns is None:
+            self._columns = list(frame.columns)
+            self._new_sheet()
+        for row in _plain_rows(frame[self._columns]):
+            if self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._sheet_rows += 1
+
+    def close(self) -> None:
+        if self._columns is None:
+            # openpyxl can't save a workbook without sheets
+            self._workbook.create_sheet("report_1")
+        self._workbook.save(self.path)
+
+def open_report_writer(path: str) -> ReportWriter:
+    """Pick the writer from the extension: .parquet, .xlsx, .csv or .csv.gz."""
+    lower = path.lower()
+    if lower.endswith(".parquet"):
+        return ParquetReportWriter(path)
+    if lower.endswith(".xlsx"):
+        return XlsxReportWriter(path)
+    if lower.endswith(".csv") or lower.endswith(".csv.gz"):
+        return CsvReportWriter(path)
+    raise ValueError(f"Unsupported report format: {path}")
@@ -0,0 +1,131 @@
+"""
+Opt-in span tracing written as a Chrome trace (open it in Perfetto or
+chrome://tracing). Off by default; while off, span() is a shared no-op.
+
+    with tracing.span("/shipments/{id}", "http", method="GET") as span:
+        ...
+        span.set(status=200)
+"""
+import atexit
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import util as multiprocessing_util
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+
+_events: List[Dict[str, Any]] = []
+_lock = threading.Lock()
+_enabled = False
+_dropped = 0
+_written = False
+
+def enabled() -> bool:
+    return _enabled
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name: str, cat: str, args: Dict[str, Any]):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        global _dropped
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        event = {
+            "name": self.name, "cat": self.cat, "ph": "X",
+            "ts": self.start / 1000, "dur": (end - self.start) / 1000,
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": self.args,
+        }
+        with _lock:
+            if len(_events) < settings.TRACE_MAX_EVENTS:
+                _events.append(event)
+            else:
+                _dropped += 1
+
+class _NoopSpan:
+    def set(self, **args: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name: str, cat: str = "app", **args: Any) -> Any:
+    """Time a block as a trace event (a no-op unless tracing is on)."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name, cat, args)
+
+def start() -> None:
+    global _enabled
+    _enabled = True
+
+def write(path: str) -> None:
+    """Write the recorded spans (plus thread names) as Chrome trace JSON."""
+    global _written
+    with _lock:
+        events = list(_events)
+        dropped = _dropped
+    threads = {t.ident: t.name for t in threading.enumerate()}
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": threads.get(tid, str(tid))}}
+        for tid in {e["tid"] for e in events}
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms", "otherData": {"dropped_events": dropped}}, f)
+    _written = True
+
+def configure(path: Optional[str] = None) -> Optional[str]:
+    """
+    Start tracing when a path is given (or TRACE_PATH is set) and write the
+    trace when the process exits. "{pid}" in the path is replaced, so every
+    process of a pool writes its own file. Returns the resolved path.
+    """
+    path = path or settings.TRACE_PATH
+    if not path:
+        return None
+    path = path.replace("{pid}", str(os.getpid()))
+    start()
+
+    def finish() -> None:
+        if not _written:
+            write(path)
+
+    atexit.register(finish)
+    # Pool processes exit without running atexit handlers, but do run these
+    multiprocessing_util.Finalize(None, finish, exitpriority=10)
+    return path
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """cProfile the block (calling thread only) and dump stats to `path` for pstats/snakeviz."""
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,109 @@
+import os
+from typing import IO, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Optional: without pyarrow SKUs stay object strings and nothing is cached
+    pa = None
+    feather = None
+
+TRUTH_COLUMNS = ["sku", "weight_kg", "width", "height", "depth"]
+DIMENSION_COLUMNS = ["weight_kg", "width", "height", "depth"]
+CACHE_SUFFIX = ".cache.feather"
+_FINGERPRINT_KEY = b"source_fingerprint"
+
+def _sku_dtype():
+    # Arrow-backed strings take a fraction of the memory of Python str objects
+    return pd.ArrowDtype(pa.string()) if pa is not None else object
+
+def _types_mapper(arrow_type):
+    # Keep SKUs Arrow-backed when reading the cache; dimensions come back as numpy float32
+    return pd.ArrowDtype(arrow_type) if pa.types.is_string(arrow_type) else None
+
+def _fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def _cache_path(path: str, cache_dir: Optional[str]) -> str:
+    if cache_dir:
+        return os.path.join(cache_dir, os.path.basename(path) + CACHE_SUFFIX)
+    return path + CACHE_SUFFIX
+
+def _validate_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Coerce dimensions to float32 and drop rows that can't be audited."""
+    missing = [c for c in TRUTH_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"SKU truth table is missing columns: {', '.join(missing)}")
+
+    chunk = chunk[TRUTH_COLUMNS]
+    dims = chunk[DIMENSION_COLUMNS].apply(pd.to_numeric, errors="coerce").astype(np.float32)
+    valid = chunk["sku"].notna() & dims.notna().all(axis=1) & (dims > 0).all(axis=1)
+    dropped = int((~valid).sum())
+    if dropped:
+        print(f"Warning: dropping {dropped} truth rows with missing SKU or invalid dimensions")
+
+    out = dims[valid]
+    out.insert(0, "sku", chunk.loc[valid, "sku"].astype(str).str.strip().astype(_sku_dtype()))
+    return out
+
+def iter_truth_chunks(source: Union[str, IO[str]], chunksize: int = 500_000) -> Iterator[pd.DataFrame]:
+    """
+    Parse a truth CSV (path or open text stream) into validated chunks.
+    Row labels keep counting across chunks, so they are line positions in the file.
+    """
+    chunks = pd.read_csv(
+        source,
+        usecols=lambda c: c in TRUTH_COLUMNS,
+        dtype={"sku": str},
+        chunksize=chunksize,
+    )
+    for chunk in chunks:
+        yield _validate_chunk(chunk)
+
+def _read_csv(path: str, chunksize: int) -> pd.DataFrame:
+    frames = list(iter_truth_chunks(path, chunksize))
+    if not frames:
+        return _validate_chunk(pd.DataFrame(columns=TRUTH_COLUMNS))
+    return pd.concat(frames, ignore_index=True)
+
+def load_sku_truth(
+    path: str,
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+    chunksize: int = 500_000,
+) -> pd.DataFrame:
+    """
+    Load the SKU truth table with compact dtypes: Arrow strings for SKU
+    (when pyarrow is installed) and float32 dimensions, validated chunk by chunk.
+
+    With pyarrow, the parsed table is also saved as a Feather file next to the
+    CSV (or in cache_dir) and memory-mapped on later runs; it is rebuilt
+    whenever the CSV's mtime or size changes.
+    """
+    fingerprint = _fingerprint(path)  # Also raises FileNotFoundError early
+    use_cache = use_cache and feather is not None
+    cache = _cache_path(path, cache_dir)
+
+    if use_cache and os.path.exists(cache):
+        try:
+            table = feather.read_table(cache, memory_map=True)
+            if (table.schema.metadata or {}).get(_FINGERPRINT_KEY) == fingerprint.encode():
+                return table.to_pandas(types_mapper=_types_mapper)
+        except (OSError, pa.ArrowInvalid):
+            pass  # Corrupt or unreadable cache, rebuild it
+
+    df = _read_csv(path, chunksize)
+
+    if use_cache:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _FINGERPRINT_KEY: fingerprint.encode()})
+        try:
+            feather.write_feather(table, cache + ".tmp", compression="uncompressed")  # uncompressed can be memory-mapped
+            os.replace(cache + ".tmp", cache)
+        except OSError as e:
+            print(f"Warning: could not write truth cache {cache}: {e}")
+    return df
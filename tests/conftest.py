@@ -0,0 +1,5 @@
+import os
+
+# Settings require app credentials at import time; tests never reach the real API
+os.environ.setdefault("APP_ID", "test-app")
+os.environ.setdefault("CLIENT_SECRET", "test-secret")
@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from src.meli_auditor.async_client import AsyncMeliClient
+from src.meli_auditor.rate_limit import RateLimiter
+
+class StaticAuth:
+    def get_token(self):
+        return "token"
+
+def make_client(handler):
+    return AsyncMeliClient(
+        StaticAuth(),
+        rate_limiter=RateLimiter("test", app_rate=0, seller_rate=0),
+        transport=httpx.MockTransport(handler),
+    )
+
+def run(client, call):
+    async def main():
+        async with client:
+            return await call(client)
+    return asyncio.run(main())
+
+def test_get_shipments_fetches_each_id_once_and_keeps_errors_in_place():
+    requested = []
+
+    def handler(request):
+        shipment_id = int(request.url.path.rsplit("/", 1)[1])
+        requested.append(shipment_id)
+        assert request.headers["Authorization"] == "Bearer token"
+        if shipment_id == 2:
+            return httpx.Response(404, json={"message": "not found"})
+        return httpx.Response(200, json={"id": shipment_id})
+
+    results = run(make_client(handler), lambda c: c.get_shipments([1, 2, 1, 3]))
+
+    assert sorted(requested) == [1, 2, 3]
+    assert results[0] == results[2] == {"id": 1}
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    assert results[3] == {"id": 3}
+
+def test_get_items_details_chunks_multiget_and_keeps_order():
+    chunks = []
+
+    def handler(request):
+        ids = request.url.params["ids"].split(",")
+        chunks.append(ids)
+        return httpx.Response(200, json=[{"code": 200, "body": {"id": i}} for i in ids])
+
+    ids = [f"MLA{i}" for i in range(45)]
+    details = run(make_client(handler), lambda c: c.get_items_details(ids))
+
+    assert [d["id"] for d in details] == ids
+    assert sorted(len(chunk) for chunk in chunks) == [5, 20, 20]
+
+def test_get_items_ids_follows_scroll_id():
+    pages = {None: (["MLA1", "MLA2"], "s1"), "s1": (["MLA3"], "s2"), "s2": ([], None)}
+
+    def handler(request):
+        results, scroll_id = pages[request.url.params.get("scroll_id")]
+        return httpx.Response(200, content=json.dumps({"results": results, "scroll_id": scroll_id}))
+
+    assert run(make_client(handler), lambda c: c.get_items_ids(7)) == ["MLA1", "MLA2", "MLA3"]
+
+def test_request_retries_429_after_retry_after():
+    responses = [httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={"id": 9})]
+
+    def handler(request):
+        return responses.pop(0)
+
+    assert run(make_client(handler), lambda c: c.get_me()) == {"id": 9}
+    assert responses == []
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.app.services import audit
+from src.app.services.audit import _resume_range
+
+DAY = timedelta(days=1)
+D = datetime(2024, 6, 2, tzinfo=timezone.utc)
+
+def state(date_from, date_to, done_until):
+    return {"date_from": date_from.isoformat(), "date_to": date_to.isoformat(), "done_until": done_until.isoformat()}
+
+def test_rolling_range_finishes_failed_window_and_audits_new_one():
+    # Yesterday's nightly audit failed halfway; today's covers the next day
+    saved = state(D - DAY, D, D - DAY / 2)
+    assert _resume_range(saved, D, D + DAY, explicit=False) == (D - DAY, D + DAY, D - DAY / 2)
+
+def test_rolling_range_overlapping_a_longer_saved_range():
+    saved = state(D - 30 * DAY, D, D - 10 * DAY)
+    assert _resume_range(saved, D - 29 * DAY, D + DAY, explicit=False) == (D - 30 * DAY, D + DAY, D - 10 * DAY)
+
+def test_rolling_range_starting_earlier_does_not_skip_unaudited_days():
+    saved = state(D - DAY, D, D - DAY / 2)
+    assert _resume_range(saved, D - 3 * DAY, D, explicit=False) == (D - 3 * DAY, D, D - 3 * DAY)
+
+def test_rolling_range_not_touching_the_saved_one_starts_over():
+    saved = state(D - 5 * DAY, D - 4 * DAY, D - 4 * DAY - DAY / 2)
+    assert _resume_range(saved, D, D + DAY, explicit=False) is None
+
+def test_explicit_range_resumes_only_the_same_range():
+    saved = state(D - DAY, D, D - DAY / 2)
+    assert _resume_range(saved, D - DAY, D, explicit=True) == (D - DAY, D, D - DAY / 2)
+    assert _resume_range(saved, D - DAY, D + DAY, explicit=True) is None
+
+class OrdersClient:
+    def __init__(self):
+        self.me_calls = 0
+        self.searched = []
+
+    def get_me(self):
+        self.me_calls += 1
+        return {"id": 77}
+
+    def iter_orders(self, seller_id, date_from, date_to):
+        self.searched.append(seller_id)
+        return iter([])
+
+def test_run_user_audit_resolves_seller_once(monkeypatch):
+    client = OrdersClient()
+    user = SimpleNamespace(meli_user_id=77)
+    monkeypatch.setattr(audit, "setup_client", lambda session, user_id: (user, None, client))
+    monkeypatch.setattr(audit, "load_checkpoint", lambda *args, **kwargs: None)
+    monkeypatch.setattr(audit, "save_checkpoint", lambda *args: None)
+    monkeypatch.setattr(audit, "clear_checkpoint", lambda *args: None)
+    monkeypatch.setattr(audit.auditor_settings, "RATE_CARD_PATH", None)
+
+    audit.run_user_audit(1, session=None, date_from=D - 90 * DAY, date_to=D)
+
+    assert client.me_calls == 0
+    assert len(client.searched) == 90 and set(client.searched) == {77}
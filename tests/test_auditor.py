@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.meli_auditor.auditor import AUDIT_COLUMNS, MeliAuditor, _shipment_batches
+from src.meli_auditor.rate_card import RateCard
+
+TRUTH = pd.DataFrame({
+    "sku": ["SKU-A", "SKU-B"],
+    "weight_kg": [1.0, 0.2],
+    "width": [10.0, 50.0],
+    "height": [10.0, 40.0],
+    "depth": [10.0, 30.0],
+})
+
+def order(order_id, shipment_id, *lines):
+    return {
+        "id": order_id,
+        "date_created": "2024-01-01T00:00:00.000-00:00",
+        "shipping": {"id": shipment_id},
+        "order_items": [
+            {"item": {"id": item_id, "seller_sku": sku}, "quantity": quantity}
+            for item_id, sku, quantity in lines
+        ],
+    }
+
+def shipment(shipment_id, base_cost, *items, status="delivered", state="AR-C"):
+    return {
+        "id": shipment_id,
+        "base_cost": base_cost,
+        "status": status,
+        "receiver_address": {"state": {"id": state}},
+        "shipping_items": [{"id": item_id, "dimensions": dimensions} for item_id, dimensions in items],
+    }
+
+def make_auditor(truth=TRUTH, rate_card=None):
+    return MeliAuditor(client=None, truth_loader=lambda skus: truth[truth["sku"].isin(skus)], rate_card=rate_card)
+
+@pytest.fixture
+def rate_card():
+    return RateCard(pd.DataFrame({"max_weight_kg": [1.0, 5.0, 30.0], "cost": [1000.0, 2000.0, 5000.0]}))
+
+def test_audit_batch_joins_truth_and_billed_dimensions():
+    orders = [order(1, 100, ("MLA1", "SKU-A", 1)), order(2, 200, ("MLA2", "SKU-B", 2))]
+    shipments = [
+        shipment(100, 1500, ("MLA1", "12.0x10.0x10.0,1500.0")),
+        shipment(200, 3000, ("MLA2", "50.0x40.0x30.0,200.0")),
+    ]
+    df = make_auditor().audit_batch(orders, shipments)
+
+    assert list(df.columns) == AUDIT_COLUMNS
+    a, b = df.set_index("sku").loc["SKU-A"], df.set_index("sku").loc["SKU-B"]
+    assert a["truth_vol"] == "10x10x10"
+    assert a["truth_volume_cm3"] == 1000
+    assert a["truth_billable_weight"] == 1.0  # heavier than its 0.2 kg volumetric weight
+    assert a["billed_billable_weight"] == 1.5
+    assert a["billable_weight_delta"] == pytest.approx(0.5)
+    assert b["truth_billable_weight"] == pytest.approx(12.0)  # 60000 cm3 / 5000
+    assert b["billable_weight_delta"] == pytest.approx(0.0)
+    assert b["destination"] == "AR-C"
+
+def test_audit_batch_skips_unknown_and_missing_skus():
+    orders = [order(1, 100, ("MLA1", "SKU-A", 1), ("MLA9", "UNKNOWN", 1), ("MLA8", None, 1))]
+    df = make_auditor().audit_batch(orders, [shipment(100, 1500)])
+
+    assert df["sku"].tolist() == ["SKU-A"]
+    # No shipping_items reported: billed side stays NaN instead of failing
+    assert np.isnan(df["billed_billable_weight"].iloc[0])
+
+def test_audit_batch_empty_batches_keep_columns():
+    assert list(make_auditor().audit_batch([], []).columns) == AUDIT_COLUMNS
+    no_truth = make_auditor().audit_batch([order(1, 100, ("MLA9", "UNKNOWN", 1))], [shipment(100, 1500)])
+    assert no_truth.empty
+    assert list(no_truth.columns) == AUDIT_COLUMNS
+
+def test_auditor_requires_exactly_one_truth_source():
+    with pytest.raises(ValueError):
+        MeliAuditor(client=None)
+
+@pytest.mark.parametrize("missing_line", [("MLA8", None, 1), ("MLA9", "UNKNOWN", 1)], ids=["no_sku", "no_truth"])
+def test_pack_with_unaudited_line_is_partial(rate_card, missing_line):
+    # Two orders of one pack: the second line has no truth, so the package totals are partial
+    orders = [order(1, 100, ("MLA1", "SKU-A", 1)), order(2, 100, missing_line)]
+    auditor = make_auditor(rate_card=rate_card)
+    df = auditor.calculate_money_lost(auditor.audit_batch(orders, [shipment(100, 5000)]))
+
+    assert df["order_id"].tolist() == [1]
+    assert not df["shipment_truth_complete"].iloc[0]
+    assert df["logic_note"].iloc[0] == "Partial shipment: some lines missing from truth table"
+    assert np.isnan(df["money_lost_estimate"].iloc[0])
+
+def test_complete_pack_is_audited_as_one_package(rate_card):
+    orders = [order(1, 100, ("MLA1", "SKU-A", 1)), order(2, 100, ("MLA1", "SKU-A", 2))]
+    auditor = make_auditor(rate_card=rate_card)
+    df = auditor.calculate_money_lost(auditor.audit_batch(orders, [shipment(100, 5000)]))
+
+    assert df["shipment_truth_complete"].all()
+    assert df["expected_cost"].sum() == 2000  # 3 kg pack quoted once
+    assert df["money_lost_estimate"].sum() == 3000
+
+def test_shipment_batches_keep_interleaved_packs_together():
+    # Packs of 3 orders whose orders are spread up to 10 positions apart
+    orders = [order(i, 1000 + (i % 10) + 10 * (i // 30), ("MLA1", "SKU-A", 1)) for i in range(300)]
+    batches = list(_shipment_batches(orders, size=25, window=15))
+
+    assert sorted(o["id"] for batch in batches for o in batch) == list(range(300))
+    shipment_batch = {}
+    for number, batch in enumerate(batches):
+        assert len(batch) <= 25 + 15
+        for o in batch:
+            assert shipment_batch.setdefault(o["shipping"]["id"], number) == number
+
+def test_shipment_batches_without_packs_match_plain_batching():
+    orders = [order(i, 1000 + i, ("MLA1", "SKU-A", 1)) for i in range(100)]
+    batches = list(_shipment_batches(orders, size=20, window=5))
+    assert [o["id"] for batch in batches for o in batch] == list(range(100))
+    assert all(len(batch) == 20 for batch in batches)
+
+def test_shipment_batches_drop_orders_without_shipment():
+    orders = [order(i, None if i % 3 == 0 else 1000 + i, ("MLA1", "SKU-A", 1)) for i in range(5000)]
+    batches = list(_shipment_batches(orders, size=200))
+
+    assert sum(len(batch) for batch in batches) == 5000 - 1667
+    assert all(o["shipping"]["id"] for batch in batches for o in batch)
+    assert all(len(batch) <= 200 + 200 for batch in batches)
+    assert all(len(batch) >= 200 for batch in batches[:-1])
+
+MALFORMED_ORDERS = {
+    "bad_quantity": order(2, 200, ("MLA1", "SKU-A", "two")),
+    "no_order_items": {"id": 2, "shipping": {"id": 200}},
+    "null_order_items": {"id": 2, "shipping": {"id": 200}, "order_items": None},
+    "no_id": {"shipping": {"id": 200}, "order_items": [{"item": {"id": "MLA1", "seller_sku": "SKU-A"}, "quantity": 1}]},
+}
+
+@pytest.mark.parametrize("bad", MALFORMED_ORDERS.values(), ids=MALFORMED_ORDERS.keys())
+def test_audit_batch_skips_malformed_orders(bad):
+    # The bad order's pack is partial; other shipments are audited as usual
+    orders = [order(1, 100, ("MLA1", "SKU-A", 1)), order(3, 200, ("MLA1", "SKU-A", 1)), bad]
+    df = make_auditor().audit_batch(orders, [shipment(100, 1500), shipment(200, 1500)]).set_index("order_id")
+
+    assert df.index.tolist() == [1, 3]
+    assert df.loc[1, "shipment_truth_complete"]
+    assert not df.loc[3, "shipment_truth_complete"]
+
+def test_audit_batch_missing_quantity_counts_as_one(rate_card):
+    auditor = make_auditor(rate_card=rate_card)
+    df = auditor.calculate_money_lost(auditor.audit_batch([order(1, 100, ("MLA1", "SKU-A", None))], [shipment(100, 1500)]))
+    assert df["expected_cost"].tolist() == [1000]
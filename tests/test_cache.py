@@ -0,0 +1,92 @@
+import sqlite3
+
+from src.meli_auditor import cache as cache_module
+from src.meli_auditor import client as client_module
+from src.meli_auditor.cache import ResponseCache
+from src.meli_auditor.client import MeliClient
+
+def test_memory_tier_is_lru():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a").body == 1
+    assert cache.get("c").is_fresh
+
+def test_disk_tier_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.set("/shipments/1", {"id": 1}, ttl=60, etag='"v1"')
+    cache.close()
+
+    entry = ResponseCache(path).get("/shipments/1")
+    assert entry.body == {"id": 1}
+    assert entry.etag == '"v1"'
+
+def test_prune_on_open_keeps_revalidatable_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.set("expired", 1, ttl=-1)
+    cache.set("expired-with-etag", 2, ttl=-1, etag='"v1"')
+    cache.set("fresh", 3, ttl=60)
+    cache.close()
+
+    reopened = ResponseCache(path)
+    assert reopened.get("expired") is None
+    assert not reopened.get("expired-with-etag").is_fresh
+    assert reopened.get("fresh").body == 3
+
+def test_disk_tier_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "PRUNE_EVERY", 1)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(cache_module.time, "time", lambda: next(clock))
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_entries=1, max_disk_entries=2)
+    cache.set("a", 1, ttl=3600)
+    cache.set("b", 2, ttl=3600)
+    cache.get("a")  # read back from disk, so "b" is now least recently used
+    cache.set("c", 3, ttl=3600)
+
+    assert cache.get("b") is None
+    assert cache.get("a").body == 1
+    assert cache.get("c").body == 3
+
+def test_upgrades_files_without_accessed_at(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE response_cache (key TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, expires_at REAL NOT NULL)"
+    )
+    db.execute("INSERT INTO response_cache VALUES ('a', '1', NULL, 9999999999)")
+    db.commit()
+    db.close()
+
+    assert ResponseCache(path).get("a").body == 1
+
+class Response:
+    def __init__(self, status_code, body=None, etag=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self):
+        return self._body
+
+def test_revalidation_keeps_etag_when_304_omits_it(monkeypatch):
+    # Always stale, so every call revalidates
+    monkeypatch.setattr(client_module, "shipment_ttl", lambda body: -1)
+    cache = ResponseCache()
+    client = MeliClient(auth=None, cache=cache)
+    sent = []
+    responses = [Response(200, {"id": 1, "status": "shipped"}, etag='"v1"'), Response(304), Response(304)]
+
+    def send(method, endpoint, extra_headers=None, **kwargs):
+        sent.append(extra_headers)
+        return responses.pop(0)
+    client._send = send
+
+    for _ in range(3):
+        assert client.get_shipment(1) == {"id": 1, "status": "shipped"}
+
+    assert sent == [None, {"If-None-Match": '"v1"'}, {"If-None-Match": '"v1"'}]
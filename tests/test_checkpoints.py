@@ -0,0 +1,76 @@
+import json
+import random
+import time
+
+from src.app.services.checkpoints import ScanProgress
+
+def sparse_ids(n, seed=0):
+    # A seller's ids are scattered over the global MeLi id space
+    rng = random.Random(seed)
+    return [f"MLA{n}" for n in rng.sample(range(1_000_000_000, 2_000_000_000), n)]
+
+def chunks(ids, size=20):
+    return [(start, ids[start:start + size]) for start in range(0, len(ids), size)]
+
+def test_prefix_advances_only_when_contiguous():
+    ids = sparse_ids(60)
+    first, second, third = chunks(ids)
+    progress = ScanProgress()
+
+    progress.done(*second)
+    assert progress.position == 0
+    assert progress.to_state()["done_after"] == sorted(second[1])
+
+    progress.done(*first)
+    progress.done(*third)
+    assert progress.position == 60
+    assert progress.to_state()["done_after"] == []
+
+def test_resume_skips_unchanged_prefix():
+    ids = sparse_ids(100)
+    progress = ScanProgress()
+    for start, chunk in chunks(ids)[:3]:
+        progress.done(start, chunk)
+    progress.done(*chunks(ids)[4])
+    state = json.loads(json.dumps(progress.to_state()))
+
+    resumed = ScanProgress(state)
+    assert resumed.resume_position == 60
+    assert ids[80] in resumed and ids[60] not in resumed
+    assert resumed.skip_prefix(ids[:60])
+    assert resumed.position == 60
+    resumed.done(*chunks(ids)[3])
+    resumed.done(*chunks(ids)[4])
+    assert resumed.position == 100
+    assert resumed.to_state()["done_after"] == []
+
+def test_resume_rejects_changed_scan_order():
+    ids = sparse_ids(40)
+    progress = ScanProgress()
+    progress.done(0, ids)
+
+    resumed = ScanProgress(progress.to_state())
+    assert not resumed.skip_prefix(ids[1:] + ids[:1])
+    assert resumed.position == 0
+    assert resumed.to_state()["position"] == 0
+
+def test_state_kept_until_prefix_is_verified():
+    progress = ScanProgress()
+    progress.done(0, sparse_ids(20))
+    state = progress.to_state()
+    assert ScanProgress(state).to_state() == state
+
+def test_state_stays_small_for_large_sparse_catalog():
+    ids = sparse_ids(100_000)
+    progress = ScanProgress()
+    order = chunks(ids)
+    # Complete chunks slightly out of order, as concurrent fetch workers do
+    for i in range(0, len(order), 4):
+        for start, chunk in reversed(order[i:i + 4]):
+            progress.done(start, chunk)
+
+    started = time.perf_counter()
+    state = progress.to_state()
+    assert time.perf_counter() - started < 0.1
+    assert progress.position == 100_000
+    assert len(json.dumps(state)) < 200
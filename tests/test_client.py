@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+from src.meli_auditor.client import ORDERS_MAX_OFFSET, ORDERS_PAGE_SIZE, MeliClient
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+class FakeOrdersClient(MeliClient):
+    """MeliClient whose /orders/search is served from a list of order dates."""
+    def __init__(self, dates):
+        super().__init__(auth=None)
+        self.dates = sorted(dates)
+        self.calls = []
+
+    def _search_orders(self, seller_id, date_from, date_to, offset):
+        self.calls.append((date_from, date_to, offset))
+        matching = [d for d in self.dates if date_from <= d <= date_to]
+        page = matching[offset:offset + ORDERS_PAGE_SIZE]
+        return {
+            "results": [{"id": d.isoformat(), "date_created": d.isoformat()} for d in page],
+            "paging": {"total": len(matching), "offset": offset},
+        }
+
+def test_iter_orders_walks_windows_oldest_first():
+    dates = [START + timedelta(hours=h) for h in range(0, 24 * 20, 5)]
+    client = FakeOrdersClient(dates)
+    orders = list(client.iter_orders(1, START, START + timedelta(days=20)))
+
+    assert [o["id"] for o in orders] == [d.isoformat() for d in dates]
+    # 7-day windows, each searched up to 1 ms before the next one starts
+    windows = [(f, t) for f, t, offset in client.calls if offset == 0]
+    assert len(windows) == 3
+    assert windows[0] == (START, START + timedelta(days=7) - timedelta(milliseconds=1))
+
+def test_iter_orders_excludes_date_to():
+    client = FakeOrdersClient([START, START + timedelta(days=1)])
+    orders = list(client.iter_orders(1, START, START + timedelta(days=1)))
+    assert [o["id"] for o in orders] == [START.isoformat()]
+
+def test_iter_orders_splits_windows_over_the_offset_cap():
+    # More orders in one day than a single search can page through
+    count = ORDERS_MAX_OFFSET + 3 * ORDERS_PAGE_SIZE
+    step = timedelta(days=1) / count
+    dates = [START + step * i for i in range(count)]
+    client = FakeOrdersClient(dates)
+    orders = list(client.iter_orders(1, START, START + timedelta(days=1), window=timedelta(days=1)))
+
+    assert len(orders) == count
+    assert len({o["id"] for o in orders}) == count
+    assert max(offset for _, _, offset in client.calls) <= ORDERS_MAX_OFFSET
+
+def test_iter_orders_accepts_naive_datetimes():
+    client = FakeOrdersClient([START])
+    orders = list(client.iter_orders(1, datetime(2024, 1, 1), datetime(2024, 1, 2)))
+    assert len(orders) == 1
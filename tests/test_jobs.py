@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from src.app.models.job import JOB_DONE, JOB_FAILED, Job
+from src.app.services import jobs
+from src.app.services.jobs import finish_job, run_job
+
+class UpdateSession:
+    """Records compiled UPDATEs and reports `rowcount` rows matched."""
+    def __init__(self, rowcount=1):
+        self.rowcount = rowcount
+        self.updates = []
+
+    def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.updates.append((str(compiled), compiled.params))
+        return SimpleNamespace(rowcount=self.rowcount)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+def test_finish_job_only_updates_a_job_the_worker_still_holds():
+    session = UpdateSession()
+    assert finish_job(session, 5, "worker-a", error="boom")
+
+    sql, params = session.updates[0]
+    assert "job.worker_id = %(worker_id_1)s" in sql
+    assert params["worker_id_1"] == "worker-a"
+    assert params["status"] == JOB_FAILED
+
+def test_finish_job_reports_lost_lease():
+    assert not finish_job(UpdateSession(rowcount=0), 5, "worker-a")
+
+def test_run_job_finishes_as_the_claiming_worker(monkeypatch):
+    def handler(session, job):
+        # A reclaimed job shows its new owner once reloaded
+        job.worker_id = "worker-b"
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "audit", handler)
+    session = UpdateSession()
+    run_job(session, Job(id=5, user_id=1, kind="audit", worker_id="worker-a"), "worker-a")
+
+    _, params = session.updates[-1]
+    assert params["worker_id_1"] == "worker-a"
+    assert params["status"] == JOB_DONE
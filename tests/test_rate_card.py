@@ -0,0 +1,58 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.meli_auditor.rate_card import RateCard
+from test_auditor import make_auditor, order, shipment
+
+@pytest.fixture
+def rate_card():
+    return RateCard(pd.DataFrame({"max_weight_kg": [1.0, 5.0, 30.0], "cost": [1000.0, 2000.0, 5000.0]}))
+
+def test_quote_picks_first_bracket_that_fits(rate_card):
+    zones = pd.Series(["default"] * 4)
+    quoted = rate_card.quote(pd.Series([0.5, 1.0, 1.01, 31.0]), zones)
+    assert quoted.tolist()[:3] == [1000.0, 1000.0, 2000.0]
+    assert pd.isna(quoted.iloc[3])  # above the last bracket
+
+def test_billable_weight_uses_volumetric_when_larger(rate_card):
+    billable = rate_card.billable_weight(pd.Series([1.0, 1.0]), pd.Series([1000.0, 60000.0]))
+    assert billable.tolist() == [1.0, 12.0]
+
+def test_zones_from_json(tmp_path):
+    path = tmp_path / "card.json"
+    path.write_text(json.dumps({
+        "default_zone": "national",
+        "zone_map": {"AR-C": "local"},
+        "brackets": [
+            {"zone": "local", "max_weight_kg": 5, "cost": 100},
+            {"zone": "national", "max_weight_kg": 5, "cost": 300},
+        ],
+    }))
+    card = RateCard.load(str(path))
+    zones = card.zones_for(pd.Series(["AR-C", "AR-B", None]))
+    assert zones.tolist() == ["local", "national", "national"]
+    assert card.quote(pd.Series([1.0, 1.0, 1.0]), zones).tolist() == [100.0, 300.0, 300.0]
+
+def test_missing_columns_rejected():
+    with pytest.raises(ValueError):
+        RateCard(pd.DataFrame({"max_weight_kg": [1.0]}))
+
+def test_calculate_money_lost_quotes_truth_against_billed(rate_card):
+    orders = [order(1, 100, ("MLA1", "SKU-A", 1)), order(2, 200, ("MLA1", "SKU-A", 3))]
+    shipments = [shipment(100, 2000), shipment(200, 1500)]
+    auditor = make_auditor(rate_card=rate_card)
+    df = auditor.calculate_money_lost(auditor.audit_batch(orders, shipments)).set_index("order_id")
+
+    assert df.loc[1, "expected_cost"] == 1000  # 1 kg bracket
+    assert df.loc[1, "money_lost_estimate"] == 1000
+    assert df.loc[2, "expected_cost"] == 2000  # 3 units -> 3 kg
+    assert df.loc[2, "money_lost_estimate"] == 0  # billed less than expected is not a loss
+
+def test_calculate_money_lost_without_rate_card_only_flags():
+    df = make_auditor().calculate_money_lost(
+        make_auditor().audit_batch([order(1, 100, ("MLA1", "SKU-A", 1))], [shipment(100, 2000)])
+    )
+    assert df["money_lost_estimate"].tolist() == ["Not Calculated (Requires Rate Card)"]
+
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.meli_auditor import rate_limit
+from src.meli_auditor.rate_limit import RateLimiter, TokenBucket, retry_after_seconds
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture(autouse=True)
+def fresh_buckets(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_buckets", {})
+
+def test_token_bucket_allows_burst_then_queues_in_order(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Later callers wait progressively longer instead of racing for the next token
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    for _ in range(3):
+        bucket.reserve()
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() > 0
+
+def test_rate_limiter_waits_for_the_slowest_bucket(clock):
+    limiter = RateLimiter("app", seller_id=7, app_rate=10, app_burst=5, seller_rate=1, seller_burst=1)
+    assert limiter._reserve() == 0.0
+    assert limiter._reserve() == pytest.approx(1.0)  # seller bucket is empty
+
+def test_rate_limiter_shares_buckets_per_app_and_seller(clock):
+    first = RateLimiter("app", seller_id=7, app_rate=10, app_burst=5, seller_rate=1, seller_burst=1)
+    second = RateLimiter("app", seller_id=7, app_rate=10, app_burst=5, seller_rate=1, seller_burst=1)
+    other = RateLimiter("app", seller_id=8, app_rate=10, app_burst=5, seller_rate=1, seller_burst=1)
+    assert first.buckets == second.buckets
+    assert first.buckets[0] is other.buckets[0]
+    assert first.buckets[1] is not other.buckets[1]
+
+def test_rate_limiter_zero_rate_disables_level():
+    limiter = RateLimiter("app", seller_id=7, app_rate=0, seller_rate=0)
+    assert limiter.buckets == []
+    assert limiter._reserve() == 0.0
+
+@pytest.mark.parametrize("value, expected", [("3", 3.0), ("-1", 0.0), ("soon", None), (None, None)])
+def test_retry_after_seconds(value, expected):
+    headers = {"Retry-After": value} if value is not None else {}
+    assert retry_after_seconds(SimpleNamespace(headers=headers)) == expected
+
+def test_retry_after_http_date_in_the_past():
+    response = SimpleNamespace(headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert retry_after_seconds(response) == 0.0
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from src.meli_auditor.report import CsvReportWriter, open_report_writer
+
+from test_auditor import make_auditor, order, shipment
+
+def audit_batches():
+    auditor = make_auditor()
+    # Integer costs and no billed dimensions first, fractional costs and dimensions later
+    first = auditor.audit_batch([order(1, 100, ("MLA1", "SKU-A", 1))], [shipment(100, 2500)])
+    second = auditor.audit_batch(
+        [order(2, 200, ("MLA2", "SKU-B", 1))],
+        [shipment(200, 2500.5, ("MLA2", "50.0x40.0x30.0,200.0"), state=None)],
+    )
+    return first, second
+
+def test_parquet_accepts_batches_with_different_inferred_types(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "report.parquet")
+    first, second = audit_batches()
+    with open_report_writer(path) as writer:
+        writer.write(first)
+        writer.write(second)
+
+    df = pd.read_parquet(path)
+    assert df["billed_cost"].tolist() == [2500.0, 2500.5]
+    assert df["order_id"].tolist() == [1, 2]
+    assert df["destination"].isna().tolist() == [False, True]
+    assert writer.rows_written == 2
+
+def test_parquet_types_all_missing_columns_as_text(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "report.parquet")
+    with open_report_writer(path) as writer:
+        writer.write(pd.DataFrame({"order_id": [1], "logic_note": [None]}))
+        writer.write(pd.DataFrame({"order_id": [2], "logic_note": ["Compared against truth table"]}))
+
+    assert pd.read_parquet(path)["logic_note"].tolist() == [None, "Compared against truth table"]
+
+@pytest.mark.parametrize("name", ["report.csv", "report.csv.gz"])
+def test_csv_writes_header_once(tmp_path, name):
+    path = str(tmp_path / name)
+    first, second = audit_batches()
+    with CsvReportWriter(path) as writer:
+        writer.write(first)
+        writer.write(second)
+
+    df = pd.read_csv(path)
+    assert df["order_id"].tolist() == [1, 2]
+    assert list(df.columns) == list(first.columns)
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        open_report_writer("report.json")
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.app.core.config import settings
+from src.app.services import sync
+from src.app.services.checkpoints import ScanProgress
+from src.app.services.sync import _parse_timestamp, _recently_updated_ids, _stream_items
+from src.meli_auditor.client import ITEMS_SCAN_PAGE_SIZE, ITEMS_SEARCH_MAX_OFFSET
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+def stamp(minutes_ago):
+    return (NOW - timedelta(minutes=minutes_ago)).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+class FakeItemsClient:
+    """Serves a catalog of item id -> last_updated, searched newest first."""
+    def __init__(self, items):
+        self.items = items
+        self.detail_calls = 0
+
+    def iter_recently_updated_ids(self, user_id):
+        ranked = sorted(self.items, key=lambda i: self.items[i], reverse=True)
+        for offset in range(0, min(len(ranked), ITEMS_SEARCH_MAX_OFFSET + 1), ITEMS_SCAN_PAGE_SIZE):
+            yield ranked[offset:offset + ITEMS_SCAN_PAGE_SIZE]
+
+    def get_items_details(self, ids, attributes=None, max_workers=1):
+        self.detail_calls += 1
+        return [{"id": i, "last_updated": self.items[i]} for i in ids]
+
+def test_recently_updated_ids_stops_at_first_older_item():
+    items = {f"MLA{i}": stamp(i) for i in range(5000)}
+    client = FakeItemsClient(items)
+    ids = _recently_updated_ids(client, 1, NOW - timedelta(minutes=30))
+
+    assert ids == [f"MLA{i}" for i in range(31)]
+    assert client.detail_calls == 1  # one page, not the whole catalog
+
+def test_recently_updated_ids_small_catalog_all_changed():
+    client = FakeItemsClient({f"MLA{i}": stamp(i) for i in range(50)})
+    assert len(_recently_updated_ids(client, 1, NOW - timedelta(days=1))) == 50
+
+def test_recently_updated_ids_gives_up_past_offset_cap():
+    client = FakeItemsClient({f"MLA{i}": stamp(i) for i in range(5000)})
+    assert _recently_updated_ids(client, 1, NOW - timedelta(days=30)) is None
+
+def test_parse_timestamp():
+    assert _parse_timestamp("2024-06-01T00:00:00.000Z") == NOW
+    assert _parse_timestamp("2024-05-31T21:00:00.000-03:00") == NOW
+    assert _parse_timestamp("2024-06-01T00:00:00") == NOW
+    assert _parse_timestamp(None) is None
+    assert _parse_timestamp("yesterday") is None
+
+class FakeScanClient:
+    """Scans a catalog in pages and serves details, failing after `fail_after` detail calls."""
+    def __init__(self, ids, fail_after=None):
+        self.ids = ids
+        self.fail_after = fail_after
+        self.fetched = []
+
+    def iter_items_ids(self, user_id):
+        for start in range(0, len(self.ids), ITEMS_SCAN_PAGE_SIZE):
+            yield self.ids[start:start + ITEMS_SCAN_PAGE_SIZE]
+
+    def get_items_details(self, ids, attributes=None, max_workers=1):
+        if self.fail_after is not None and len(self.fetched) >= self.fail_after:
+            raise RuntimeError("API down")
+        self.fetched.append(list(ids))
+        return [{"id": i, "last_updated": stamp(0)} for i in ids]
+
+@pytest.fixture
+def written(monkeypatch):
+    rows = []
+    def upsert_items(session, batch):
+        rows.extend(batch)
+        return len(batch), len(batch)
+    monkeypatch.setattr(sync, "upsert_items", upsert_items)
+    monkeypatch.setattr(settings, "SYNC_BATCH_SIZE", 50)
+    return rows
+
+def test_stream_items_resumes_after_failure(written):
+    ids = [f"MLA{i * 7919}" for i in range(1000)]
+    progress = ScanProgress()
+    with pytest.raises(RuntimeError):
+        _stream_items(FakeScanClient(ids, fail_after=20), None, 1, 1, progress=progress)
+    state = progress.to_state()
+    assert state["position"] > 0
+
+    client = FakeScanClient(ids)
+    resumed = ScanProgress(state)
+    _stream_items(client, None, 1, 1, progress=resumed)
+
+    refetched = {i for chunk in client.fetched for i in chunk}
+    assert refetched.isdisjoint(ids[:state["position"]])
+    assert refetched.isdisjoint(state["done_after"])
+    assert {row["id"] for row in written} == set(ids)
+    assert resumed.position == len(ids)
+
+def test_stream_items_rechecks_everything_when_scan_order_changed(written):
+    ids = [f"MLA{i * 7919}" for i in range(300)]
+    progress = ScanProgress()
+    _stream_items(FakeScanClient(ids), None, 1, 1, progress=progress)
+
+    client = FakeScanClient(list(reversed(ids)))
+    _stream_items(client, None, 1, 1, progress=ScanProgress(progress.to_state()))
+    assert sum(len(chunk) for chunk in client.fetched) == len(ids)
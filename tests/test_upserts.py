@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from src.app.models.order_line import OrderLine
+from src.app.services.sync import upsert_items
+from src.app.services.upserts import bulk_upsert
+
+class RecordingSession:
+    """Compiles each statement for Postgres instead of running it."""
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.statements.append((str(compiled), compiled.params))
+        return SimpleNamespace(rowcount=1)
+
+    def commit(self):
+        self.commits += 1
+
+def line(order_id, item_id, quantity=1):
+    return {"order_id": order_id, "item_id": item_id, "user_id": 1, "quantity": quantity}
+
+def test_bulk_upsert_batches_and_keeps_last_duplicate_per_key():
+    session = RecordingSession()
+    rows = [line(1, "MLA1", 1), line(1, "MLA1", 2), line(2, "MLA1"), line(3, "MLA1")]
+    count, changed = bulk_upsert(session, OrderLine, rows, ["order_id", "item_id"], batch_size=2)
+
+    assert (count, changed) == (3, 2)  # the duplicate collapses within the first batch
+    assert session.commits == 0
+    sql, params = session.statements[0]
+    assert "ON CONFLICT (order_id, item_id) DO UPDATE SET" in sql
+    assert "quantity = excluded.quantity" in sql and "order_id = excluded" not in sql
+    assert params["quantity_m0"] == 2
+
+def test_upsert_items_skips_unchanged_content_and_commits_per_batch():
+    session = RecordingSession()
+    rows = [{"id": f"MLA{i}", "user_id": 1, "content_hash": str(i)} for i in range(3)]
+    assert upsert_items(session, rows, batch_size=2) == (3, 2)
+
+    assert session.commits == 2
+    sql, _ = session.statements[0]
+    assert "WHERE item.content_hash IS DISTINCT FROM excluded.content_hash" in sql
+    assert "title = excluded.title" in sql